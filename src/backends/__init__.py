@@ -0,0 +1,36 @@
+"""Processing backends, shared by the HTTP and gRPC servers."""
+
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from .base import Backend
+
+
+@lru_cache(maxsize=1)
+def get_backends() -> Tuple[Backend, ...]:
+    """
+    Get the process-wide backend instances.
+
+    Built on first use so pool workers that only extract page segments
+    never construct them, and shared so the HTTP and gRPC servers running
+    in one process don't each build (and warm) their own.
+    """
+    from .text_extraction import TextExtractionBackend
+    from .text_layer_detection import TextLayerDetectionBackend
+
+    return (TextExtractionBackend(), TextLayerDetectionBackend())
+
+
+@lru_cache(maxsize=1)
+def get_backend_map() -> Dict[str, Backend]:
+    """Map each supported operation to its backend; the first registered backend wins."""
+    backend_by_op: Dict[str, Backend] = {}
+    for backend in get_backends():
+        for operation in getattr(backend, "SUPPORTED_OPERATIONS", ()):
+            backend_by_op.setdefault(operation, backend)
+    return backend_by_op
+
+
+def find_backend(operation: str) -> Optional[Backend]:
+    """Find the backend for an operation, or None if it is unsupported."""
+    return get_backend_map().get(operation)
@@ -1,7 +1,7 @@
 """Base backend interface for PDF processing operations."""
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Tuple
+from typing import Dict, Tuple
 
 
 class Backend(ABC):
@@ -27,7 +27,7 @@ class Backend(ABC):
         data: bytes,
         operation: str,
         options: Dict[str, str]
-    ) -> Tuple[bytes, str, Dict[str, Any]]:
+    ) -> Tuple[bytes, str, Dict[str, str]]:
         """
         Process PDF with the specified operation.
 
@@ -40,7 +40,8 @@ class Backend(ABC):
             Tuple of (output_data, format, metadata)
             - output_data: Processed output bytes
             - format: Output format (e.g., "json", "html")
-            - metadata: Additional information about the processing
+            - metadata: Additional information about the processing, with
+              string values (sent as-is as a gRPC map<string, string>)
 
         Raises:
             ValueError: If operation is not supported or invalid options
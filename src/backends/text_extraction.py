@@ -1,20 +1,73 @@
 """Text extraction backend using PyMuPDF with font metadata."""
 
-import json
 import logging
-from typing import Dict, Any, Tuple, List
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Tuple, List, Optional
 
+import orjson
 import pymupdf
+from pybase64 import b64encode_as_string
 
 from .base import Backend
 from ..converters.role_detector import RoleDetector
 from ..converters.html_converter import HtmlConverter
 from ..converters.result_assembler import ResultAssembler
 from ..utils.page_filter import parse_page_range
+from ..utils.process_pool import (
+    DocumentSource,
+    document_size,
+    map_page_segments,
+    parallel_segments,
+    segment_document,
+    spooled_document,
+)
 from ..config import get_config
 
 logger = logging.getLogger(__name__)
 
+# (paragraphs, tables, images, skipped_as_scanned) for a single page
+PageResult = Tuple[List[Dict], List[Dict], List[Dict], bool]
+
+# Dict-level text flags without image preservation: image blocks are skipped
+# anyway, and preserving them forces every embedded image to be decoded.
+_TEXTPAGE_FLAGS = pymupdf.TEXTFLAGS_DICT & ~pymupdf.TEXT_PRESERVE_IMAGES
+
+# Fraction of the page that images must cover before a page with a little
+# text is treated as scanned; logos and small figures stay well below it
+_SCANNED_IMAGE_COVERAGE = 0.5
+
+
+def _nonblank(text: str) -> bool:
+    """True if text has any non-whitespace character (without allocating a stripped copy)."""
+    return bool(text) and not text.isspace()
+
+
+@lru_cache(maxsize=4096)
+def _primary_font(font_names: Tuple[str, ...]) -> str:
+    """Most common font in a block; cached since blocks often repeat the same spans."""
+    return Counter(font_names).most_common(1)[0][0] if font_names else ""
+
+
+def _extract_segment(
+    source: DocumentSource, page_numbers: List[int], include_images: bool
+) -> List[PageResult]:
+    """Worker entry point: extract a contiguous run of pages from the worker's own Document."""
+    backend = TextExtractionBackend()
+    image_cache = {}
+    with segment_document(source) as doc:
+        return [
+            backend._process_page(doc, page_num, include_images, image_cache)
+            for page_num in page_numbers
+        ]
+
+
+def _font_histogram_segment(source: DocumentSource, page_numbers: List[int]) -> List[Counter]:
+    """Worker entry point: font size histograms for a contiguous run of pages."""
+    backend = TextExtractionBackend()
+    with segment_document(source) as doc:
+        return [backend._page_font_sizes(doc, page_num) for page_num in page_numbers]
+
 
 class TextExtractionBackend(Backend):
     """Backend for extracting structured content from PDFs using PyMuPDF."""
@@ -25,6 +78,19 @@ class TextExtractionBackend(Backend):
         self.role_detector = RoleDetector()
         self.html_converter = HtmlConverter()
         self.assembler = ResultAssembler()
+        self.reload_config()
+
+    def reload_config(self) -> None:
+        """Snapshot extraction settings from the global configuration.
+
+        Settings are read once here rather than per request or per page; call
+        again after config.reload_config() to pick up changes.
+        """
+        extraction = get_config().extraction
+        self._title_threshold = extraction.title_font_size_threshold
+        self._heading_threshold = extraction.heading_font_size_threshold
+        self._char_threshold = extraction.text_layer_char_threshold
+        self._chunk_pages = extraction.chunk_pages
 
     def supports(self, operation: str, format: str = "") -> bool:
         return operation in self.SUPPORTED_OPERATIONS
@@ -34,13 +100,15 @@ class TextExtractionBackend(Backend):
         data: bytes,
         operation: str,
         options: Dict[str, str]
-    ) -> Tuple[bytes, str, Dict[str, Any]]:
+    ) -> Tuple[bytes, str, Dict[str, str]]:
         if not self.supports(operation):
             raise ValueError(f"Operation '{operation}' not supported")
 
         output_format = options.get("output_format", "json")
         include_images = options.get("include_images", "false").lower() == "true"
         page_range = options.get("pages", "")
+        # Only ndjson output is chunked; other formats ignore the option
+        chunk_pages = self._parse_chunk_pages(options) if output_format == "ndjson" else 0
 
         try:
             doc = pymupdf.open(stream=data, filetype="pdf")
@@ -49,57 +117,33 @@ class TextExtractionBackend(Backend):
 
         total_pages = len(doc)
         try:
-            # Determine which pages to process
+            # Determine which pages to process, resolving the valid, ordered,
+            # de-duplicated set once up front
             if page_range:
-                page_numbers = parse_page_range(page_range)
+                page_numbers = parse_page_range(page_range, max_page=total_pages)
+                valid_pages = sorted({p for p in page_numbers if 1 <= p <= total_pages})
             else:
-                page_numbers = list(range(1, total_pages + 1))
-
-            # Extract content from all requested pages
-            all_paragraphs = []
-            all_tables = []
-            all_content_blocks = []
-            all_images = []
-            para_counter = 0
-            table_counter = 0
-            img_counter = 0
-            pages_processed = 0
-
-            for page_num in page_numbers:
-                if page_num < 1 or page_num > total_pages:
-                    continue
+                page_numbers = valid_pages = list(range(1, total_pages + 1))
+            result_pages = total_pages if not page_range else len(page_numbers)
 
-                pages_processed += 1
-                page = doc[page_num - 1]
-
-                # Extract text blocks with font metadata
-                paragraphs, para_counter = self._extract_paragraphs(
-                    page, page_num, para_counter
-                )
-
-                # Extract tables
-                tables, table_counter = self._extract_tables(
-                    page, page_num, table_counter
+            if output_format == "ndjson":
+                return self._process_ndjson(
+                    doc, data, valid_pages, include_images, chunk_pages, result_pages
                 )
 
-                # Extract images if requested
-                if include_images:
-                    images, img_counter = self._extract_images(
-                        doc, page, page_num, img_counter
-                    )
-                    all_images.extend(images)
-
-                all_paragraphs.extend(paragraphs)
-                all_tables.extend(tables)
+            page_results = self._extract_pages(doc, data, valid_pages, include_images)
         finally:
             doc.close()
 
+        all_paragraphs, all_tables, all_images, pages_skipped_scanned = (
+            self._merge_page_results(page_results)
+        )
+
         # Detect semantic roles across all paragraphs
-        config = get_config()
         self.role_detector.classify(
             all_paragraphs,
-            title_threshold=config.extraction.title_font_size_threshold,
-            heading_threshold=config.extraction.heading_font_size_threshold,
+            title_threshold=self._title_threshold,
+            heading_threshold=self._heading_threshold,
         )
 
         # Assemble the result
@@ -107,7 +151,7 @@ class TextExtractionBackend(Backend):
             paragraphs=all_paragraphs,
             tables=all_tables,
             images=all_images if include_images else [],
-            total_pages=total_pages if not page_range else len(page_numbers),
+            total_pages=result_pages,
         )
 
         # Format output
@@ -115,11 +159,13 @@ class TextExtractionBackend(Backend):
             output_data = self.html_converter.convert(result).encode("utf-8")
             fmt = "html"
         else:
-            output_data = json.dumps(result, indent=2).encode("utf-8")
+            self._materialize_cells(all_tables)
+            output_data = orjson.dumps(result, option=orjson.OPT_INDENT_2)
             fmt = "json"
 
         metadata = {
-            "pages_processed": str(pages_processed),
+            "pages_processed": str(len(valid_pages)),
+            "pages_skipped_scanned": str(pages_skipped_scanned),
             "total_paragraphs": str(len(all_paragraphs)),
             "total_tables": str(len(all_tables)),
             "model_used": "pymupdf",
@@ -127,12 +173,273 @@ class TextExtractionBackend(Backend):
 
         return output_data, fmt, metadata
 
-    def _extract_paragraphs(
-        self, page, page_num: int, counter: int
-    ) -> Tuple[List[Dict], int]:
+    def _process_ndjson(
+        self,
+        doc,
+        data: bytes,
+        valid_pages: List[int],
+        include_images: bool,
+        chunk_pages: int,
+        result_pages: int,
+    ) -> Tuple[bytes, str, Dict[str, str]]:
+        """
+        Extract in chunks of pages, emitting one assembled JSON result per line.
+
+        Each chunk's paragraphs, tables and images are released once its line
+        is serialized, but the serialized lines themselves are all buffered,
+        since Backend.process returns the output as one bytes object. Role
+        detection runs in two passes: a text-only pass builds the document-wide
+        font size histogram, then each chunk is classified against that body
+        size. IDs remain unique across the whole document.
+
+        When the pages go to the process pool, the document is spooled to a
+        temporary file once, so each of the passes' maps sends workers its
+        path instead of the PDF bytes and each worker opens it only once.
+        """
+        if parallel_segments(len(valid_pages), len(data)):
+            with spooled_document(data) as source:
+                return self._process_ndjson_chunks(
+                    doc, source, valid_pages, include_images, chunk_pages, result_pages
+                )
+        return self._process_ndjson_chunks(
+            doc, data, valid_pages, include_images, chunk_pages, result_pages
+        )
+
+    def _process_ndjson_chunks(
+        self,
+        doc,
+        source: DocumentSource,
+        valid_pages: List[int],
+        include_images: bool,
+        chunk_pages: int,
+        result_pages: int,
+    ) -> Tuple[bytes, str, Dict[str, str]]:
+        """Run the ndjson histogram pass and chunk loop against one document source."""
+        body_size = self.role_detector.body_size_from_histogram(
+            self._font_histogram(doc, source, valid_pages)
+        )
+
+        lines = []
+        totals = {"para": 0, "table": 0, "img": 0, "scanned": 0}
+        for index, start in enumerate(range(0, len(valid_pages), chunk_pages)):
+            chunk = valid_pages[start:start + chunk_pages]
+            paragraphs, tables, images, skipped = self._merge_page_results(
+                self._extract_pages(doc, source, chunk, include_images),
+                para_start=totals["para"],
+                table_start=totals["table"],
+                img_start=totals["img"],
+            )
+            totals["para"] += len(paragraphs)
+            totals["table"] += len(tables)
+            totals["img"] += len(images)
+            totals["scanned"] += skipped
+
+            self.role_detector.classify(
+                paragraphs,
+                title_threshold=self._title_threshold,
+                heading_threshold=self._heading_threshold,
+                body_size=body_size,
+            )
+            result = self.assembler.assemble(
+                paragraphs=paragraphs,
+                tables=tables,
+                images=images,
+                total_pages=result_pages,
+            )
+            result["chunk"] = {
+                "index": index,
+                "first_page": chunk[0],
+                "last_page": chunk[-1],
+            }
+            self._materialize_cells(tables)
+            lines.append(orjson.dumps(result, option=orjson.OPT_APPEND_NEWLINE))
+
+        output_data = b"".join(lines)
+        metadata = {
+            "pages_processed": str(len(valid_pages)),
+            "pages_skipped_scanned": str(totals["scanned"]),
+            "total_paragraphs": str(totals["para"]),
+            "total_tables": str(totals["table"]),
+            "chunks": str(len(lines)),
+            "model_used": "pymupdf",
+        }
+
+        return output_data, "ndjson", metadata
+
+    def _parse_chunk_pages(self, options: Dict[str, str]) -> int:
+        """Read the chunk_pages option, falling back to the configured default."""
+        value = options.get("chunk_pages", "")
+        if not value:
+            return self._chunk_pages
+        try:
+            chunk_pages = int(value)
+        except ValueError:
+            raise ValueError(f"Invalid chunk_pages: {value!r}")
+        if chunk_pages < 1:
+            raise ValueError(f"Invalid chunk_pages: {value!r} (must be >= 1)")
+        return chunk_pages
+
+    def _extract_pages(
+        self,
+        doc,
+        source: DocumentSource,
+        page_numbers: List[int],
+        include_images: bool,
+    ) -> List[PageResult]:
+        """Extract pages in order, in worker processes when there are enough of them."""
+        segments = parallel_segments(len(page_numbers), document_size(source))
+        if segments:
+            return map_page_segments(
+                _extract_segment, source, page_numbers, segments, include_images
+            )
+
+        image_cache = {}
+        return [
+            self._process_page(doc, page_num, include_images, image_cache)
+            for page_num in page_numbers
+        ]
+
+    def _font_histogram(self, doc, source: DocumentSource, page_numbers: List[int]) -> Counter:
+        """Build the font size histogram for pages, in worker processes when there are enough of them."""
+        segments = parallel_segments(len(page_numbers), document_size(source))
+        if segments:
+            page_histograms = map_page_segments(
+                _font_histogram_segment, source, page_numbers, segments
+            )
+        else:
+            page_histograms = [
+                self._page_font_sizes(doc, page_num) for page_num in page_numbers
+            ]
+
+        histogram = Counter()
+        for page_histogram in page_histograms:
+            histogram.update(page_histogram)
+        return histogram
+
+    def _page_font_sizes(self, doc, page_num: int) -> Counter:
+        """Font size histogram for one page's text, skipping scanned pages."""
+        page = doc.load_page(page_num - 1)
+        textpage = page.get_textpage(flags=_TEXTPAGE_FLAGS)
+        if self._is_scanned_page(page, textpage):
+            return Counter()
+        return self.role_detector.accumulate_font_sizes(
+            self._extract_paragraphs(textpage, page_num), Counter()
+        )
+
+    def _merge_page_results(
+        self,
+        page_results: List[PageResult],
+        para_start: int = 0,
+        table_start: int = 0,
+        img_start: int = 0,
+    ) -> Tuple[List[Dict], List[Dict], List[Dict], int]:
+        """Concatenate per-page results in page order and assign sequential IDs."""
+        all_paragraphs = []
+        all_tables = []
+        all_images = []
+        pages_skipped_scanned = 0
+        for paragraphs, tables, images, scanned in page_results:
+            pages_skipped_scanned += scanned
+            all_paragraphs.extend(paragraphs)
+            all_tables.extend(tables)
+            all_images.extend(images)
+        self._assign_ids(all_paragraphs, "para", para_start)
+        self._assign_ids(all_tables, "table", table_start)
+        self._assign_ids(all_images, "img", img_start)
+        return all_paragraphs, all_tables, all_images, pages_skipped_scanned
+
+    def _process_page(
+        self,
+        doc,
+        page_num: int,
+        include_images: bool,
+        image_cache: Optional[Dict[int, Optional[Tuple[str, str]]]] = None,
+    ) -> PageResult:
+        """Extract paragraphs, tables, and optionally images from a single page.
+
+        IDs are left unset here; they are assigned document-wide once all
+        pages have been merged so that parallel runs stay deterministic.
+        Image-only (scanned) pages skip paragraph and table extraction.
+        """
+        page = doc.load_page(page_num - 1)
+
+        images = (
+            self._extract_images(doc, page, page_num, image_cache)
+            if include_images else []
+        )
+
+        # Parse the page content once for both the scanned probe and paragraphs
+        textpage = page.get_textpage(flags=_TEXTPAGE_FLAGS)
+
+        if self._is_scanned_page(page, textpage):
+            return [], [], images, True
+
+        paragraphs = self._extract_paragraphs(textpage, page_num)
+
+        # Release the text page before table detection builds its own
+        del textpage
+        tables = self._extract_tables(page, page_num)
+
+        return paragraphs, tables, images, False
+
+    def _is_scanned_page(self, page, textpage) -> bool:
+        """Cheap pre-check for image-only pages with no usable text layer.
+
+        Bailing out here avoids the block walk and find_tables() layout work,
+        which are wasted on scanned pages. A page with no text at all is
+        scanned if it has any image; one with a little text (a cover page with
+        a logo, say) only if images cover most of the page.
+        """
+        probe = textpage.extractText().strip()
+        if len(probe) >= self._char_threshold:
+            return False
+        xrefs = [image[0] for image in page.get_images(full=False)]
+        if not xrefs:
+            return False
+        if not probe:
+            return True
+
+        page_rect = page.rect
+        covered = sum(
+            abs(rect & page_rect)
+            for xref in xrefs
+            for rect in page.get_image_rects(xref)
+        )
+        return covered >= _SCANNED_IMAGE_COVERAGE * abs(page_rect)
+
+    @staticmethod
+    def _materialize_cells(tables: List[Dict]) -> None:
+        """Expand each table's cells_soa arrays into the per-cell dicts of the output schema."""
+        for table in tables:
+            soa = table.pop("cells_soa", None)
+            if soa is None:
+                continue
+            # PyMuPDF find_tables() does not expose merged cell spans,
+            # so row_span/column_span are always 1.
+            table["cells"] = [
+                {
+                    "row_index": row_idx,
+                    "column_index": col_idx,
+                    "row_span": 1,
+                    "column_span": 1,
+                    "content": content,
+                    "kind": kind,
+                }
+                for row_idx, col_idx, content, kind in zip(
+                    soa["row_index"], soa["column_index"], soa["content"], soa["kind"]
+                )
+            ]
+
+    @staticmethod
+    def _assign_ids(items: List[Dict], prefix: str, start: int = 0) -> None:
+        """Number items sequentially in-place as ``{prefix}-{n}``, starting at start."""
+        for n, item in enumerate(items, start):
+            item["id"] = f"{prefix}-{n}"
+
+    def _extract_paragraphs(self, textpage, page_num: int) -> List[Dict]:
         """Extract text blocks as paragraphs with font metadata."""
         paragraphs = []
-        text_dict = page.get_text("dict")
+        text_dict = textpage.extractDICT()
 
         for block in text_dict.get("blocks", []):
             if block.get("type") != 0:  # type 0 = text block
@@ -140,38 +447,36 @@ class TextExtractionBackend(Backend):
 
             bbox = block["bbox"]
             block_text_parts = []
-            font_sizes = []
+            size_sum = 0.0
+            size_count = 0
             font_names = []
             is_bold = False
 
             for line in block.get("lines", []):
-                line_text_parts = []
-                for span in line.get("spans", []):
-                    text = span.get("text", "").strip()
-                    if not text:
-                        continue
-                    line_text_parts.append(span["text"])
-                    font_sizes.append(span.get("size", 12.0))
+                # Blank spans are skipped, but non-blank spans keep their
+                # original (unstripped) text in the content
+                spans = [span for span in line.get("spans", []) if _nonblank(span.get("text", ""))]
+                if not spans:
+                    continue
+
+                for span in spans:
+                    size_sum += span.get("size", 12.0)
                     font_names.append(span.get("font", ""))
-                    flags = span.get("flags", 0)
-                    if flags & 16:  # bold flag
+                    if span.get("flags", 0) & 16:  # bold flag
                         is_bold = True
+                size_count += len(spans)
 
-                if line_text_parts:
-                    block_text_parts.append(" ".join(line_text_parts))
+                block_text_parts.append(" ".join(span["text"] for span in spans))
 
             content = "\n".join(block_text_parts).strip()
             if not content:
                 continue
 
-            avg_font_size = sum(font_sizes) / len(font_sizes) if font_sizes else 12.0
-            primary_font = max(set(font_names), key=font_names.count) if font_names else ""
-
-            para_id = f"para-{counter}"
-            counter += 1
+            avg_font_size = size_sum / size_count if size_count else 12.0
+            primary_font = _primary_font(tuple(font_names))
 
             paragraphs.append({
-                "id": para_id,
+                "id": None,  # Assigned after all pages are merged
                 "content": content,
                 "role": None,  # Will be set by RoleDetector
                 "page_number": page_num,
@@ -188,11 +493,9 @@ class TextExtractionBackend(Backend):
                 },
             })
 
-        return paragraphs, counter
+        return paragraphs
 
-    def _extract_tables(
-        self, page, page_num: int, counter: int
-    ) -> Tuple[List[Dict], int]:
+    def _extract_tables(self, page, page_num: int) -> List[Dict]:
         """Extract tables from a page."""
         tables = []
 
@@ -200,43 +503,44 @@ class TextExtractionBackend(Backend):
             found_tables = page.find_tables()
         except Exception as e:
             logger.warning(f"Table detection failed on page {page_num}: {e}")
-            return tables, counter
+            return tables
 
         for table in found_tables.tables:
-            table_id = f"table-{counter}"
-            counter += 1
-
             bbox = table.bbox
             extracted = table.extract()
 
             if not extracted:
                 continue
 
-            # Build cells
-            cells = []
+            # Build cells as parallel arrays; per-cell dicts are only
+            # materialized for JSON output (see _materialize_cells)
+            row_index = []
+            column_index = []
+            content = []
+            kind = []
             num_rows = len(extracted)
             num_cols = max(len(row) for row in extracted) if extracted else 0
 
             for row_idx, row in enumerate(extracted):
+                row_kind = "columnHeader" if row_idx == 0 else "content"
                 for col_idx, cell_content in enumerate(row):
-                    kind = "columnHeader" if row_idx == 0 else "content"
-                    # PyMuPDF find_tables() does not expose merged cell spans,
-                    # so row_span/column_span are always 1.
-                    cells.append({
-                        "row_index": row_idx,
-                        "column_index": col_idx,
-                        "row_span": 1,
-                        "column_span": 1,
-                        "content": str(cell_content) if cell_content is not None else "",
-                        "kind": kind,
-                    })
+                    row_index.append(row_idx)
+                    column_index.append(col_idx)
+                    content.append(str(cell_content) if cell_content is not None else "")
+                    kind.append(row_kind)
 
             tables.append({
-                "id": table_id,
+                "id": None,
                 "page_number": page_num,
                 "rows": num_rows,
                 "columns": num_cols,
-                "cells": cells,
+                "cells": None,  # Materialized from cells_soa for JSON output
+                "cells_soa": {
+                    "row_index": row_index,
+                    "column_index": column_index,
+                    "content": content,
+                    "kind": kind,
+                },
                 "bounding_box": {
                     "x_min": bbox[0],
                     "y_min": bbox[1],
@@ -245,24 +549,37 @@ class TextExtractionBackend(Backend):
                 },
             })
 
-        return tables, counter
+        return tables
 
     def _extract_images(
-        self, doc, page, page_num: int, counter: int
-    ) -> Tuple[List[Dict], int]:
-        """Extract embedded images from a page."""
-        import base64
+        self,
+        doc,
+        page,
+        page_num: int,
+        image_cache: Optional[Dict[int, Optional[Tuple[str, str]]]] = None,
+    ) -> List[Dict]:
+        """Extract embedded images from a page.
+
+        image_cache maps xref to (mime_type, base64 data) so images repeated
+        across pages (logos, letterheads) are decoded and encoded only once.
+        """
+        if image_cache is None:
+            image_cache = {}
         images = []
 
         for img_info in page.get_images(full=True):
             xref = img_info[0]
             try:
-                img_data = doc.extract_image(xref)
-                if not img_data:
+                if xref not in image_cache:
+                    img_data = doc.extract_image(xref)
+                    image_cache[xref] = (
+                        (f"image/{img_data['ext']}", b64encode_as_string(img_data["image"]))
+                        if img_data else None
+                    )
+                cached = image_cache[xref]
+                if cached is None:
                     continue
-
-                img_id = f"img-{counter}"
-                counter += 1
+                mime_type, encoded = cached
 
                 # Get image bounding box
                 img_rects = page.get_image_rects(xref)
@@ -278,14 +595,14 @@ class TextExtractionBackend(Backend):
                     bbox = {"x_min": 0, "y_min": 0, "x_max": 0, "y_max": 0}
 
                 images.append({
-                    "id": img_id,
+                    "id": None,
                     "page_number": page_num,
-                    "mime_type": f"image/{img_data['ext']}",
-                    "data": base64.b64encode(img_data["image"]).decode("utf-8"),
+                    "mime_type": mime_type,
+                    "data": encoded,
                     "bounding_box": bbox,
                 })
 
             except Exception as e:
                 logger.warning(f"Failed to extract image xref={xref} on page {page_num}: {e}")
 
-        return images, counter
+        return images
@@ -1,22 +1,46 @@
 """Text layer detection backend using PyMuPDF."""
 
-import json
 import logging
-from typing import Dict, Any, Tuple
+from typing import Dict, Tuple, List
 
+import orjson
 import pymupdf
 
 from .base import Backend
 from ..config import get_config
+from ..utils.process_pool import (
+    DocumentSource,
+    map_page_segments,
+    parallel_segments,
+    segment_document,
+)
 
 logger = logging.getLogger(__name__)
 
 
+def _count_page_chars(page) -> int:
+    """Count characters in a page's plain text layer, ignoring surrounding whitespace."""
+    return len(page.get_text("text", flags=pymupdf.TEXTFLAGS_TEXT).strip())
+
+
+def _count_segment(source: DocumentSource, page_numbers: List[int]) -> List[int]:
+    """Worker entry point: count text-layer characters for a run of pages."""
+    with segment_document(source) as doc:
+        return [_count_page_chars(doc.load_page(n - 1)) for n in page_numbers]
+
+
 class TextLayerDetectionBackend(Backend):
     """Backend for detecting which pages have extractable text layers."""
 
     SUPPORTED_OPERATIONS = ["detect_text_layer"]
 
+    def __init__(self):
+        self.reload_config()
+
+    def reload_config(self) -> None:
+        """Snapshot the default character threshold from the global configuration."""
+        self._char_threshold = get_config().extraction.text_layer_char_threshold
+
     def supports(self, operation: str, format: str = "") -> bool:
         return operation in self.SUPPORTED_OPERATIONS
 
@@ -25,15 +49,11 @@ class TextLayerDetectionBackend(Backend):
         data: bytes,
         operation: str,
         options: Dict[str, str]
-    ) -> Tuple[bytes, str, Dict[str, Any]]:
+    ) -> Tuple[bytes, str, Dict[str, str]]:
         if not self.supports(operation):
             raise ValueError(f"Operation '{operation}' not supported")
 
-        config = get_config()
-        threshold = int(options.get(
-            "char_threshold",
-            str(config.extraction.text_layer_char_threshold)
-        ))
+        threshold = int(options.get("char_threshold", self._char_threshold))
 
         try:
             doc = pymupdf.open(stream=data, filetype="pdf")
@@ -41,26 +61,31 @@ class TextLayerDetectionBackend(Backend):
             raise ValueError("Invalid or corrupted PDF file")
 
         try:
-            pages = []
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                text = page.get_text("text")
-                char_count = len(text.strip())
-
-                pages.append({
-                    "page": page_num + 1,
-                    "has_text_layer": char_count >= threshold,
-                    "char_count": char_count,
-                })
+            page_numbers = list(range(1, len(doc) + 1))
+            segments = parallel_segments(len(page_numbers), len(data))
+            if not segments:
+                char_counts = [_count_page_chars(page) for page in doc]
         finally:
             doc.close()
 
+        if segments:
+            char_counts = map_page_segments(_count_segment, data, page_numbers, segments)
+
+        pages = [
+            {
+                "page": page_num,
+                "has_text_layer": char_count >= threshold,
+                "char_count": char_count,
+            }
+            for page_num, char_count in zip(page_numbers, char_counts)
+        ]
+
         result = {
             "total_pages": len(pages),
             "pages": pages,
         }
 
-        output_data = json.dumps(result, indent=2).encode("utf-8")
+        output_data = orjson.dumps(result, option=orjson.OPT_INDENT_2)
         metadata = {
             "total_pages": str(len(pages)),
             "pages_with_text": str(sum(1 for p in pages if p["has_text_layer"])),
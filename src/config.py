@@ -5,6 +5,20 @@ from dataclasses import dataclass, field
 from typing import Optional
 
 
+# Upper bound on the default worker count; each worker holds its own copy
+# of the PDF being processed, so more workers multiply per-request memory
+_MAX_DEFAULT_WORKERS = 4
+
+
+def _default_workers() -> int:
+    """CPUs this process may run on (its affinity, not the host's core count), capped."""
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+    return max(1, min(cpus, _MAX_DEFAULT_WORKERS))
+
+
 @dataclass
 class ExtractionConfig:
     """Configuration for PDF extraction."""
@@ -20,6 +34,18 @@ class ExtractionConfig:
     max_file_size_mb: int = field(
         default_factory=lambda: int(os.environ.get("MAX_FILE_SIZE_MB", "100"))
     )
+    extraction_workers: int = field(
+        default_factory=lambda: int(os.environ.get("EXTRACTION_WORKERS", str(_default_workers())))
+    )
+    parallel_min_pages: int = field(
+        default_factory=lambda: int(os.environ.get("PARALLEL_MIN_PAGES", "16"))
+    )
+    chunk_pages: int = field(
+        default_factory=lambda: int(os.environ.get("CHUNK_PAGES", "500"))
+    )
+    process_min_bytes: int = field(
+        default_factory=lambda: int(os.environ.get("PROCESS_MIN_BYTES", str(256 * 1024)))
+    )
 
 
 @dataclass
@@ -1,6 +1,30 @@
 """Converts DocumentAnalysisResult to HTML matching Azure DI output format."""
 
-from typing import Dict
+from itertools import repeat
+from typing import Dict, Iterator, List, Tuple
+
+# Single-pass replacement table for HTML special characters, applied with
+# str.translate (in C) rather than html.escape's chained str.replace calls
+_ESCAPE_TABLE = str.maketrans({
+    "&": "&amp;",
+    "<": "&lt;",
+    ">": "&gt;",
+    '"': "&quot;",
+    "'": "&#039;",
+})
+
+# Paragraph role to HTML tag; anything else renders as <p>
+_ROLE_TAGS = {
+    "title": "h1",
+    "sectionHeading": "h2",
+}
+
+
+_HTML_HEAD = '<html><head><meta charset="utf-8"></head><body>'
+_HTML_TAIL = '</body></html>'
+
+# Output for a result with no content blocks
+_EMPTY_HTML = _HTML_HEAD + _HTML_TAIL
 
 
 class HtmlConverter:
@@ -13,80 +37,97 @@ class HtmlConverter:
         Produces the same HTML structure as DocumentIntelligenceClient.convertToHtml()
         in the doc-proc service.
         """
-        html = '<html><head><meta charset="utf-8"></head><body>'
+        content_blocks = result.get("content_blocks")
+        if not content_blocks:
+            return _EMPTY_HTML
+
+        parts = [_HTML_HEAD]
 
         # Create lookup maps
         paragraphs_by_id = {p["id"]: p for p in result.get("paragraphs", [])}
         tables_by_id = {t["id"]: t for t in result.get("tables", [])}
         images_by_id = {i["id"]: i for i in result.get("images", [])}
 
+        # <img> tags by (mime, data); repeated images share one base64 string
+        # from extraction, so each distinct payload is formatted only once
+        img_tags: Dict[Tuple[str, str], str] = {}
+
         # Output content in order using content_blocks
-        for block in result.get("content_blocks", []):
+        for block in content_blocks:
             if block["type"] == "paragraph":
                 para = paragraphs_by_id.get(block["content_id"])
                 if para:
                     tag = self._get_role_tag(para.get("role"))
-                    html += f'<{tag}>{self._escape_html(para["content"])}</{tag}>'
+                    parts.append(f'<{tag}>{para["content"].translate(_ESCAPE_TABLE)}</{tag}>')
 
             elif block["type"] == "table":
                 table = tables_by_id.get(block["content_id"])
                 if table:
-                    html += self._table_to_html(table)
+                    self._append_table_html(table, parts)
 
             elif block["type"] == "image":
                 img = images_by_id.get(block["content_id"])
                 if img and img.get("data"):
-                    mime = img.get("mime_type", "image/png")
-                    html += f'<img src="data:{mime};base64,{img["data"]}" />'
+                    key = (img.get("mime_type", "image/png"), img["data"])
+                    tag = img_tags.get(key)
+                    if tag is None:
+                        tag = img_tags[key] = f'<img src="data:{key[0]};base64,{key[1]}" />'
+                    parts.append(tag)
 
-        html += '</body></html>'
-        return html
+        parts.append(_HTML_TAIL)
+        return "".join(parts)
 
     def _get_role_tag(self, role: str = None) -> str:
         """Map paragraph role to HTML tag."""
-        if role == "title":
-            return "h1"
-        elif role == "sectionHeading":
-            return "h2"
-        return "p"
+        return _ROLE_TAGS.get(role, "p")
 
-    def _table_to_html(self, table: Dict) -> str:
-        """Convert a table dict to HTML."""
-        html = f'<table border="1" id="{table["id"]}"><tbody>'
+    def _append_table_html(self, table: Dict, parts: List[str]) -> None:
+        """Append a table dict's HTML to the document's parts list."""
+        parts.append(f'<table border="1" id="{table["id"]}"><tbody>')
 
         # Group cells by row
         rows = []
-        for cell in table.get("cells", []):
-            while len(rows) <= cell["row_index"]:
+        for row_idx, col_idx, content, kind, row_span, column_span in self._iter_cells(table):
+            while len(rows) <= row_idx:
                 rows.append([None] * table.get("columns", 0))
-            if cell["column_index"] < len(rows[cell["row_index"]]):
-                rows[cell["row_index"]][cell["column_index"]] = cell
+            if col_idx < len(rows[row_idx]):
+                rows[row_idx][col_idx] = (content, kind, row_span, column_span)
 
         # Render rows
         for row in rows:
-            html += '<tr>'
+            parts.append('<tr>')
             for cell in row:
                 if cell is None:
-                    html += '<td></td>'
+                    parts.append('<td></td>')
                     continue
 
-                tag = 'th' if cell.get("kind") == "columnHeader" else 'td'
-                colspan = f' colspan="{cell["column_span"]}"' if cell.get("column_span", 1) > 1 else ''
-                rowspan = f' rowspan="{cell["row_span"]}"' if cell.get("row_span", 1) > 1 else ''
+                content, kind, row_span, column_span = cell
+                tag = 'th' if kind == "columnHeader" else 'td'
+                colspan = f' colspan="{column_span}"' if column_span > 1 else ''
+                rowspan = f' rowspan="{row_span}"' if row_span > 1 else ''
 
-                html += f'<{tag}{colspan}{rowspan}>{self._escape_html(cell["content"])}</{tag}>'
-            html += '</tr>'
+                parts.append(f'<{tag}{colspan}{rowspan}>{content.translate(_ESCAPE_TABLE)}</{tag}>')
+            parts.append('</tr>')
 
-        html += '</tbody></table>'
-        return html
+        parts.append('</tbody></table>')
 
-    def _escape_html(self, text: str) -> str:
-        """Escape HTML special characters."""
+    def _iter_cells(self, table: Dict) -> Iterator[Tuple[int, int, str, str, int, int]]:
+        """
+        Yield (row, column, content, kind, row_span, column_span) for each cell.
+
+        Reads the parallel cells_soa arrays produced during extraction when
+        present, otherwise the per-cell dicts of the output schema.
+        """
+        soa = table.get("cells_soa")
+        if soa is not None:
+            return zip(
+                soa["row_index"], soa["column_index"], soa["content"], soa["kind"],
+                repeat(1), repeat(1),
+            )
         return (
-            text
-            .replace("&", "&amp;")
-            .replace("<", "&lt;")
-            .replace(">", "&gt;")
-            .replace('"', "&quot;")
-            .replace("'", "&#039;")
+            (
+                cell["row_index"], cell["column_index"], cell["content"], cell.get("kind"),
+                cell.get("row_span", 1), cell.get("column_span", 1),
+            )
+            for cell in table.get("cells") or []
         )
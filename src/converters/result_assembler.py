@@ -1,7 +1,17 @@
 """Assembles extraction results into DocumentAnalysisResult format."""
 
+from collections import defaultdict
+from operator import itemgetter
 from typing import Dict, List
 
+import numpy as np
+
+# Below this many paragraphs the NumPy setup cost outweighs the vectorized check
+VECTORIZE_MIN_PARAGRAPHS = 32
+
+# Bounding box dict -> (x_min, y_min, x_max, y_max) tuple in one C call
+_bbox_tuple = itemgetter("x_min", "y_min", "x_max", "y_max")
+
 
 class ResultAssembler:
     """Assembles paragraphs, tables, and images into a unified DocumentAnalysisResult."""
@@ -21,41 +31,50 @@ class ResultAssembler:
         """
         images = images or []
 
-        # Build content blocks for ordering
-        content_blocks = []
+        # Build content blocks for ordering, bucketed by page so each page
+        # only sorts its own blocks
+        blocks_by_page: Dict[int, List[Dict]] = defaultdict(list)
 
         # Filter paragraphs that overlap with table bounding boxes
         filtered_paragraphs = self._filter_table_overlaps(paragraphs, tables)
 
         for para in filtered_paragraphs:
             bbox = para.get("bounding_box", {})
-            content_blocks.append({
+            page = para.get("page_number", 1)
+            blocks_by_page[page].append({
                 "type": "paragraph",
-                "page": para.get("page_number", 1),
+                "page": page,
                 "y_position": bbox.get("y_min", 0),
                 "content_id": para["id"],
             })
 
         for table in tables:
             bbox = table.get("bounding_box", {})
-            content_blocks.append({
+            page = table.get("page_number", 1)
+            blocks_by_page[page].append({
                 "type": "table",
-                "page": table.get("page_number", 1),
+                "page": page,
                 "y_position": bbox.get("y_min", 0),
                 "content_id": table["id"],
             })
 
         for img in images:
             bbox = img.get("bounding_box", {})
-            content_blocks.append({
+            page = img.get("page_number", 1)
+            blocks_by_page[page].append({
                 "type": "image",
-                "page": img.get("page_number", 1),
+                "page": page,
                 "y_position": bbox.get("y_min", 0),
                 "content_id": img["id"],
             })
 
-        # Sort by page then y position
-        content_blocks.sort(key=lambda b: (b["page"], b["y_position"]))
+        # Sort by page then y position (stable, so ties keep insertion order)
+        content_blocks = []
+        by_y = itemgetter("y_position")
+        for page in sorted(blocks_by_page):
+            page_blocks = blocks_by_page[page]
+            page_blocks.sort(key=by_y)
+            content_blocks.extend(page_blocks)
 
         # Build full text from filtered paragraphs
         full_text = "\n".join(p["content"] for p in filtered_paragraphs)
@@ -77,15 +96,60 @@ class ResultAssembler:
         if not tables:
             return paragraphs
 
+        # Bucket tables by page so each paragraph only checks same-page tables
+        tables_by_page: Dict[int, List[Dict]] = defaultdict(list)
+        for table in tables:
+            tables_by_page[table.get("page_number")].append(table)
+
+        if len(paragraphs) >= VECTORIZE_MIN_PARAGRAPHS:
+            keep = self._overlap_keep_mask(paragraphs, tables_by_page)
+            return [para for para, kept in zip(paragraphs, keep) if kept]
+
         filtered = []
         for para in paragraphs:
-            if not self._overlaps_any_table(para, tables):
+            page_tables = tables_by_page.get(para.get("page_number"), ())
+            if not self._overlaps_any_table(para, page_tables):
                 filtered.append(para)
 
         return filtered
 
+    def _overlap_keep_mask(
+        self, paragraphs: List[Dict], tables_by_page: Dict[int, List[Dict]]
+    ) -> np.ndarray:
+        """Vectorized overlap check; returns a mask of paragraphs to keep."""
+        keep = np.ones(len(paragraphs), dtype=bool)
+
+        indices_by_page: Dict[int, List[int]] = defaultdict(list)
+        for i, para in enumerate(paragraphs):
+            page = para.get("page_number")
+            if para.get("bounding_box") and page in tables_by_page:
+                indices_by_page[page].append(i)
+
+        for page, indices in indices_by_page.items():
+            t_boxes = [t["bounding_box"] for t in tables_by_page[page] if t.get("bounding_box")]
+            if not t_boxes:
+                continue
+
+            p_arr = np.array(
+                [_bbox_tuple(paragraphs[i]["bounding_box"]) for i in indices], dtype=float
+            )
+            t_arr = np.array([_bbox_tuple(b) for b in t_boxes], dtype=float)
+
+            # (paragraphs, tables) overlap extents via broadcasting
+            overlap_x = (
+                np.minimum(p_arr[:, None, 2], t_arr[None, :, 2])
+                - np.maximum(p_arr[:, None, 0], t_arr[None, :, 0])
+            )
+            overlap_y = (
+                np.minimum(p_arr[:, None, 3], t_arr[None, :, 3])
+                - np.maximum(p_arr[:, None, 1], t_arr[None, :, 1])
+            )
+            keep[indices] = ~((overlap_x > 0) & (overlap_y > 0)).any(axis=1)
+
+        return keep
+
     def _overlaps_any_table(self, para: Dict, tables: List[Dict]) -> bool:
-        """Check if a paragraph bounding box overlaps with any table."""
+        """Check if a paragraph bounding box overlaps with any of the given same-page tables."""
         p_bbox = para.get("bounding_box")
         if not p_bbox:
             return False
@@ -95,14 +159,12 @@ class ResultAssembler:
             if not t_bbox:
                 continue
 
-            if para.get("page_number") != table.get("page_number"):
+            # Check vertical overlap first: paragraphs usually sit above or
+            # below a table, so most pairs are rejected without the x check
+            if min(p_bbox["y_max"], t_bbox["y_max"]) <= max(p_bbox["y_min"], t_bbox["y_min"]):
                 continue
 
-            # Check bounding box overlap
-            overlap_x = max(0, min(p_bbox["x_max"], t_bbox["x_max"]) - max(p_bbox["x_min"], t_bbox["x_min"]))
-            overlap_y = max(0, min(p_bbox["y_max"], t_bbox["y_max"]) - max(p_bbox["y_min"], t_bbox["y_min"]))
-
-            if overlap_x > 0 and overlap_y > 0:
+            if min(p_bbox["x_max"], t_bbox["x_max"]) > max(p_bbox["x_min"], t_bbox["x_min"]):
                 return True
 
         return False
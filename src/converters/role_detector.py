@@ -2,7 +2,7 @@
 
 import logging
 from collections import Counter
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +15,7 @@ class RoleDetector:
         paragraphs: List[Dict],
         title_threshold: float = 18.0,
         heading_threshold: float = 14.0,
+        body_size: Optional[float] = None,
     ) -> None:
         """
         Classify paragraph roles in-place based on font heuristics.
@@ -27,44 +28,59 @@ class RoleDetector:
             paragraphs: List of paragraph dicts (modified in-place)
             title_threshold: Font size above which text is classified as title
             heading_threshold: Font size above which text is classified as heading
+            body_size: Precomputed body font size (e.g. from a document-wide
+                       histogram when classifying one chunk at a time); detected
+                       from the given paragraphs when omitted
         """
         if not paragraphs:
             return
 
         # Determine body font size from frequency distribution
-        body_size = self._detect_body_font_size(paragraphs)
-        logger.debug(f"Detected body font size: {body_size}")
+        if body_size is None:
+            body_size = self._detect_body_font_size(paragraphs)
+            logger.debug(f"Detected body font size: {body_size}")
 
+        # Roles depend only on (size, bold) once the body size is fixed, and
+        # documents use a handful of distinct combinations
+        roles: Dict[Tuple[float, bool], Optional[str]] = {}
         for para in paragraphs:
             font = para.get("font", {})
-            font_size = font.get("size", 12.0)
-            is_bold = font.get("bold", False)
-
-            role = self._classify_single(
-                font_size=font_size,
-                is_bold=is_bold,
-                body_size=body_size,
-                title_threshold=title_threshold,
-                heading_threshold=heading_threshold,
-            )
+            key = (font.get("size", 12.0), font.get("bold", False))
+
+            try:
+                role = roles[key]
+            except KeyError:
+                role = roles[key] = self._classify_single(
+                    font_size=key[0],
+                    is_bold=key[1],
+                    body_size=body_size,
+                    title_threshold=title_threshold,
+                    heading_threshold=heading_threshold,
+                )
             para["role"] = role
 
-    def _detect_body_font_size(self, paragraphs: List[Dict]) -> float:
-        """Find the most common font size (assumed to be body text)."""
-        sizes = []
+    def accumulate_font_sizes(self, paragraphs: List[Dict], counter: Counter) -> Counter:
+        """Add paragraphs' length-weighted font sizes to a histogram and return it."""
         for para in paragraphs:
             font = para.get("font", {})
             size = font.get("size", 12.0)
             # Weight by content length — longer paragraphs are more likely body text
             weight = min(len(para.get("content", "")), 200)
-            sizes.extend([round(size, 1)] * weight)
+            if weight:
+                counter[round(size, 1)] += weight
+        return counter
 
-        if not sizes:
+    def body_size_from_histogram(self, counter: Counter) -> float:
+        """Pick the dominant font size from a histogram, defaulting to 12.0."""
+        if not counter:
             return 12.0
 
-        counter = Counter(sizes)
         return counter.most_common(1)[0][0]
 
+    def _detect_body_font_size(self, paragraphs: List[Dict]) -> float:
+        """Find the most common font size (assumed to be body text)."""
+        return self.body_size_from_histogram(self.accumulate_font_sizes(paragraphs, Counter()))
+
     def _classify_single(
         self,
         font_size: float,
@@ -1,17 +1,20 @@
 """HTTP server for the PyMuPDF processing service using FastAPI."""
 
 import asyncio
-import base64
 import logging
 import time
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Tuple
 
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
-from pydantic import BaseModel, Field
+import orjson
+import pybase64
+from fastapi import FastAPI, HTTPException, Request, UploadFile, File, Form
+from fastapi.exceptions import RequestValidationError
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, Field, ValidationError
 
+from .backends import find_backend, get_backend_map
 from .backends.base import Backend
-from .backends.text_extraction import TextExtractionBackend
-from .backends.text_layer_detection import TextLayerDetectionBackend
 from .config import get_config
 
 logging.basicConfig(
@@ -20,6 +23,52 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# "auto" already prefers uvloop and httptools when uvicorn[standard] installed
+# them, and falls back where it didn't (Windows, PyPy, Cygwin).
+# Per-request access logging is disabled, it dominates tiny probe responses.
+UVICORN_OPTIONS: Dict[str, Any] = {
+    "loop": "auto",
+    "http": "auto",
+    "access_log": False,
+}
+
+# Read size for multipart uploads, checked against the limit after each chunk
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Media types for non-JSON backend output formats
+MEDIA_TYPES = {
+    "html": "text/html",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def accepts(request: Request, media_type: str) -> bool:
+    """Check whether the Accept header explicitly lists a media type with a non-zero q.
+
+    Media types are compared case-insensitively (RFC 9110); ``media_type``
+    must be given in lower case.
+    """
+    for media_range in request.headers.get("accept", "").split(","):
+        range_type, *params = media_range.split(";")
+        if range_type.strip().lower() != media_type:
+            continue
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+class OrjsonResponse(JSONResponse):
+    """JSON response serialized with orjson."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
 
 # Pydantic models
 class ProcessRequest(BaseModel):
@@ -36,35 +85,90 @@ class HealthResponse(BaseModel):
     version: str = "0.1.0"
 
 
+async def read_process_request(http_request: Request) -> ProcessRequest:
+    """
+    Parse and validate a /process body without Starlette caching the raw bytes.
+
+    The body is streamed into a local buffer that is released on return, so
+    only the base64 string (shared with the parsed model) outlives parsing.
+    Errors are raised as RequestValidationError to keep FastAPI's 422 shape.
+    """
+    body = bytearray()
+    async for chunk in http_request.stream():
+        body.extend(chunk)
+
+    try:
+        payload = orjson.loads(body)
+    except orjson.JSONDecodeError as e:
+        raise RequestValidationError([{
+            "type": "json_invalid",
+            "loc": ("body", e.pos),
+            "msg": "JSON decode error",
+            "input": {},
+            "ctx": {"error": e.msg},
+        }])
+
+    try:
+        return ProcessRequest.model_validate(payload)
+    except ValidationError as e:
+        raise RequestValidationError([
+            {**error, "loc": ("body", *error["loc"])}
+            for error in e.errors(include_url=False)
+        ])
+
+
 def create_app() -> FastAPI:
     """Create and configure the FastAPI application."""
     app = FastAPI(
         title="PyMuPDF Processing Service",
         description="PDF text extraction, table detection, and text layer analysis using PyMuPDF",
         version="0.1.0",
+        default_response_class=OrjsonResponse,
     )
-
-    backends: List[Backend] = [
-        TextExtractionBackend(),
-        TextLayerDetectionBackend(),
-    ]
-
-    supported_operations = set()
-    for backend in backends:
-        if hasattr(backend, "SUPPORTED_OPERATIONS"):
-            supported_operations.update(backend.SUPPORTED_OPERATIONS)
-
-    def find_backend(operation: str) -> Optional[Backend]:
-        for backend in backends:
-            if backend.supports(operation):
-                return backend
-        return None
+    # Extraction JSON compresses well; small probe responses are left alone
+    app.add_middleware(GZipMiddleware, minimum_size=4096, compresslevel=5)
+
+    # Upload limit is fixed for the app's lifetime, like the backends' config
+    extraction_config = get_config().extraction
+    max_file_size_mb = extraction_config.max_file_size_mb
+    max_bytes = max_file_size_mb * 1024 * 1024
+
+    # Sorted once; reported by every health probe and unsupported-operation error
+    supported_sorted = tuple(sorted(get_backend_map()))
+
+    async def read_upload(file: UploadFile) -> bytearray:
+        """Read an upload in chunks, rejecting it as soon as it exceeds the size limit."""
+        too_large = HTTPException(
+            status_code=400,
+            detail={"success": False, "error": f"File exceeds {max_file_size_mb}MB limit"},
+        )
+        if file.size is not None and file.size > max_bytes:
+            raise too_large
+
+        # Returned as-is: PyMuPDF and the process pool accept a bytearray,
+        # so there is no final copy into bytes
+        data = bytearray()
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            data.extend(chunk)
+            if len(data) > max_bytes:
+                raise too_large
+        return data
+
+    async def run_backend(
+        backend: Backend, data: bytes, operation: str, options: Dict[str, str]
+    ) -> Tuple[bytes, str, Dict[str, str]]:
+        """Run a backend off the event loop.
+
+        Backends send page work for long or large documents to the process
+        pool themselves, after their one parse of the document.
+        """
+        return await asyncio.to_thread(backend.process, data, operation, options)
 
     @app.get("/health", response_model=HealthResponse)
     async def health_check() -> HealthResponse:
         return HealthResponse(
             status="ok",
-            operations=sorted(list(supported_operations)),
+            operations=supported_sorted,
             version="0.1.0",
         )
 
@@ -74,22 +178,17 @@ def create_app() -> FastAPI:
 
     @app.post("/api/extract")
     async def extract(
+        request: Request,
         file: UploadFile = File(...),
         output_format: str = Form("json"),
         pages: str = Form(""),
         include_images: str = Form("false"),
+        chunk_pages: str = Form(""),
     ):
         """Extract structured content from a PDF via multipart upload."""
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
 
-        pdf_data = await file.read()
-        config = get_config()
-        max_bytes = config.extraction.max_file_size_mb * 1024 * 1024
-        if len(pdf_data) > max_bytes:
-            raise HTTPException(
-                status_code=400,
-                detail={"success": False, "error": f"File exceeds {config.extraction.max_file_size_mb}MB limit"},
-            )
+        pdf_data = await read_upload(file)
 
         logger.info(f"Extract request: size={len(pdf_data)} bytes, format={output_format}")
 
@@ -101,29 +200,42 @@ def create_app() -> FastAPI:
             options = {"output_format": output_format, "include_images": include_images}
             if pages:
                 options["pages"] = pages
+            if chunk_pages:
+                options["chunk_pages"] = chunk_pages
 
-            output_data, fmt, metadata = await asyncio.to_thread(
-                backend.process, pdf_data, "extract", options
+            output_data, fmt, metadata = await run_backend(
+                backend, pdf_data, "extract", options
             )
-            processing_time_ms = int((time.time() - start_time) * 1000)
+            processing_time_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
 
             if fmt == "json":
-                import json
-                return {
+                # Splice the backend's serialized JSON into the envelope as-is
+                return OrjsonResponse({
                     "success": True,
-                    "result": json.loads(output_data.decode("utf-8")),
+                    "result": orjson.Fragment(output_data),
                     "format": "application/json",
                     "metadata": metadata,
                     "processing_time_ms": processing_time_ms,
-                }
-            else:
-                return {
-                    "success": True,
-                    "result": output_data.decode("utf-8"),
-                    "format": "text/html",
-                    "metadata": metadata,
-                    "processing_time_ms": processing_time_ms,
-                }
+                })
+            media_type = MEDIA_TYPES.get(fmt, f"text/{fmt}")
+            if accepts(request, media_type):
+                # Clients asking for the format itself get the backend's bytes
+                # untouched, with the envelope fields moved into headers
+                return Response(
+                    content=output_data,
+                    media_type=media_type,
+                    headers={
+                        "X-Metadata": orjson.dumps(metadata).decode("utf-8"),
+                        "X-Processing-Time-Ms": str(processing_time_ms),
+                    },
+                )
+            return {
+                "success": True,
+                "result": output_data.decode("utf-8"),
+                "format": media_type,
+                "metadata": metadata,
+                "processing_time_ms": processing_time_ms,
+            }
 
         except ValueError as e:
             raise HTTPException(status_code=400, detail={"success": False, "error": str(e)})
@@ -134,16 +246,9 @@ def create_app() -> FastAPI:
     @app.post("/api/detect-text-layer")
     async def detect_text_layer(file: UploadFile = File(...)):
         """Detect which pages have extractable text layers."""
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
 
-        pdf_data = await file.read()
-        config = get_config()
-        max_bytes = config.extraction.max_file_size_mb * 1024 * 1024
-        if len(pdf_data) > max_bytes:
-            raise HTTPException(
-                status_code=400,
-                detail={"success": False, "error": f"File exceeds {config.extraction.max_file_size_mb}MB limit"},
-            )
+        pdf_data = await read_upload(file)
 
         logger.info(f"Detect text layer request: size={len(pdf_data)} bytes")
 
@@ -152,18 +257,17 @@ def create_app() -> FastAPI:
             raise HTTPException(status_code=500, detail="Detection backend not available")
 
         try:
-            output_data, fmt, metadata = await asyncio.to_thread(
-                backend.process, pdf_data, "detect_text_layer", {}
+            output_data, fmt, metadata = await run_backend(
+                backend, pdf_data, "detect_text_layer", {}
             )
-            processing_time_ms = int((time.time() - start_time) * 1000)
+            processing_time_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
 
-            import json
-            return {
+            return OrjsonResponse({
                 "success": True,
-                "result": json.loads(output_data.decode("utf-8")),
+                "result": orjson.Fragment(output_data),
                 "metadata": metadata,
                 "processing_time_ms": processing_time_ms,
-            }
+            })
 
         except ValueError as e:
             raise HTTPException(status_code=400, detail={"success": False, "error": str(e)})
@@ -171,21 +275,29 @@ def create_app() -> FastAPI:
             logger.exception(f"Detection failed: {e}")
             raise HTTPException(status_code=500, detail={"success": False, "error": str(e)})
 
-    @app.post("/process")
-    async def process_document(request: ProcessRequest) -> Dict[str, Any]:
+    @app.post(
+        "/process",
+        openapi_extra={
+            "requestBody": {
+                "required": True,
+                "content": {"application/json": {"schema": ProcessRequest.model_json_schema()}},
+            }
+        },
+    )
+    async def process_document(http_request: Request) -> Dict[str, Any]:
         """Process a PDF via base64-encoded payload (compatible with pyworker pattern)."""
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
+        request = await read_process_request(http_request)
 
         try:
-            document_data = base64.b64decode(request.data, validate=True)
+            # pybase64 reads the ASCII str buffer directly, avoiding a bytes copy
+            document_data = pybase64.b64decode(request.data, validate=True)
         except Exception as e:
             raise HTTPException(
                 status_code=400,
                 detail={"success": False, "error": {"code": "INVALID_BASE64", "message": str(e)}}
             )
 
-        config = get_config()
-        max_bytes = config.extraction.max_file_size_mb * 1024 * 1024
         if len(document_data) > max_bytes:
             raise HTTPException(
                 status_code=400,
@@ -193,7 +305,7 @@ def create_app() -> FastAPI:
                     "success": False,
                     "error": {
                         "code": "FILE_TOO_LARGE",
-                        "message": f"File exceeds {config.extraction.max_file_size_mb}MB limit",
+                        "message": f"File exceeds {max_file_size_mb}MB limit",
                     }
                 }
             )
@@ -207,33 +319,33 @@ def create_app() -> FastAPI:
                     "error": {
                         "code": "INVALID_OPERATION",
                         "message": f"Operation '{request.operation}' is not supported",
-                        "details": {"supported_operations": sorted(list(supported_operations))},
+                        "details": {"supported_operations": supported_sorted},
                     }
                 }
             )
 
         try:
-            output_data, output_format, metadata = await asyncio.to_thread(
-                backend.process, document_data, request.operation, request.options
+            output_data, output_format, metadata = await run_backend(
+                backend, document_data, request.operation, request.options
             )
 
-            processing_time_ms = int((time.time() - start_time) * 1000)
+            processing_time_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
 
             if output_format == "json":
-                import json
-                return {
+                # Splice the backend's serialized JSON into the envelope as-is
+                return OrjsonResponse({
                     "success": True,
-                    "result": json.loads(output_data.decode("utf-8")),
+                    "result": orjson.Fragment(output_data),
                     "format": "application/json",
-                    "metadata": {str(k): str(v) for k, v in metadata.items()},
+                    "metadata": metadata,
                     "processing_time_ms": processing_time_ms,
-                }
+                })
             else:
                 return {
                     "success": True,
                     "result": output_data.decode("utf-8"),
-                    "format": f"text/{output_format}",
-                    "metadata": {str(k): str(v) for k, v in metadata.items()},
+                    "format": MEDIA_TYPES.get(output_format, f"text/{output_format}"),
+                    "metadata": metadata,
                     "processing_time_ms": processing_time_ms,
                 }
 
@@ -266,6 +378,7 @@ def run_server():
         host=config.server.host,
         port=config.server.port,
         log_level="info",
+        **UVICORN_OPTIONS,
     )
 
 
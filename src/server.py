@@ -26,7 +26,7 @@ MAX_MESSAGE_LENGTH = 100 * 1024 * 1024  # 100MB
 def start_http_health_server():
     """Start the HTTP health server in a background thread."""
     import uvicorn
-    from .http_server import app
+    from .http_server import UVICORN_OPTIONS, app
 
     http_port = int(os.environ.get('HTTP_PORT', '8089'))
     logger.info(f"Starting HTTP health server on port {http_port}")
@@ -36,20 +36,22 @@ def start_http_health_server():
         host="0.0.0.0",
         port=http_port,
         log_level="warning",
+        **UVICORN_OPTIONS,
     )
 
 
 class GracefulKiller:
-    """Handle graceful shutdown on SIGTERM and SIGINT."""
+    """Record SIGTERM and SIGINT so the main thread can stop the gRPC server."""
 
     def __init__(self):
-        self.kill_now = False
+        self.stop_requested = threading.Event()
         signal.signal(signal.SIGINT, self.exit_gracefully)
         signal.signal(signal.SIGTERM, self.exit_gracefully)
 
     def exit_gracefully(self, signum, frame):
         logger.info(f"Received signal {signum}, shutting down gracefully...")
-        self.kill_now = True
+        # Only flag it here; stopping the server happens in serve()
+        self.stop_requested.set()
 
 
 def serve(port: int = DEFAULT_PORT):
@@ -71,20 +73,15 @@ def serve(port: int = DEFAULT_PORT):
     logger.info(f"Max message length: {MAX_MESSAGE_LENGTH / 1024 / 1024}MB")
 
     killer = GracefulKiller()
-    try:
-        while not killer.kill_now:
-            server.wait_for_termination(timeout=1)
-    except KeyboardInterrupt:
-        logger.info("Keyboard interrupt received")
-    finally:
-        logger.info("Stopping server...")
-        server.stop(grace=5)
-        logger.info("Server stopped")
+    # Blocks until a signal arrives; in-flight RPCs then get the grace period
+    killer.stop_requested.wait()
+    logger.info("Stopping server...")
+    server.stop(grace=5).wait()
+    logger.info("Server stopped")
 
 
 def main():
     """Main entry point."""
-    import os
     port = int(os.environ.get('GRPC_PORT', DEFAULT_PORT))
 
     logger.info("=" * 60)
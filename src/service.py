@@ -2,7 +2,7 @@
 
 import time
 import logging
-from typing import List
+from typing import Optional, Tuple
 
 import grpc
 from pymupdf_worker_pb2 import (
@@ -15,9 +15,8 @@ from pymupdf_worker_pb2 import (
 )
 from pymupdf_worker_pb2_grpc import PyMuPDFWorkerServicer
 
+from .backends import find_backend, get_backend_map, get_backends
 from .backends.base import Backend
-from .backends.text_extraction import TextExtractionBackend
-from .backends.text_layer_detection import TextLayerDetectionBackend
 
 logging.basicConfig(
     level=logging.INFO,
@@ -32,10 +31,9 @@ class PyMuPDFWorkerService(PyMuPDFWorkerServicer):
     VERSION = "0.1.0"
 
     def __init__(self):
-        self.backends: List[Backend] = [
-            TextExtractionBackend(),
-            TextLayerDetectionBackend(),
-        ]
+        # Shared with the HTTP server when both run in this process
+        self.backends: Tuple[Backend, ...] = get_backends()
+        self._supported_sorted = tuple(sorted(get_backend_map()))
 
         logger.info(f"PyMuPDFWorker Service v{self.VERSION} initialized")
         logger.info(f"Registered {len(self.backends)} backends")
@@ -67,13 +65,12 @@ class PyMuPDFWorkerService(PyMuPDFWorkerServicer):
     ) -> ProcessResponse:
         operation = request.operation
         document_data = request.document_data
-        options = dict(request.options)
 
         logger.info(
             f"Processing: operation={operation}, size={len(document_data)} bytes"
         )
 
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
 
         try:
             backend = self._find_backend(operation)
@@ -83,14 +80,16 @@ class PyMuPDFWorkerService(PyMuPDFWorkerServicer):
                 return ProcessResponse(
                     success=False,
                     error_message=error_msg,
-                    processing_time_ms=int((time.time() - start_time) * 1000)
+                    processing_time_ms=(time.perf_counter_ns() - start_ns) // 1_000_000
                 )
 
+            # Backends only read options, so the protobuf map is passed as-is.
+            # Page work for long or large documents goes to the process pool.
             output_data, output_format, metadata = backend.process(
-                document_data, operation, options
+                document_data, operation, request.options
             )
 
-            processing_time_ms = int((time.time() - start_time) * 1000)
+            processing_time_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
 
             logger.info(
                 f"Completed in {processing_time_ms}ms: "
@@ -107,7 +106,7 @@ class PyMuPDFWorkerService(PyMuPDFWorkerServicer):
             )
 
         except Exception as e:
-            processing_time_ms = int((time.time() - start_time) * 1000)
+            processing_time_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
             error_msg = f"Processing failed: {str(e)}"
             logger.error(error_msg, exc_info=True)
 
@@ -122,19 +121,11 @@ class PyMuPDFWorkerService(PyMuPDFWorkerServicer):
         request: Empty,
         context: grpc.ServicerContext
     ) -> HealthResponse:
-        supported_ops = set()
-        for backend in self.backends:
-            if hasattr(backend, 'SUPPORTED_OPERATIONS'):
-                supported_ops.update(backend.SUPPORTED_OPERATIONS)
-
         return HealthResponse(
             healthy=True,
             version=self.VERSION,
-            supported_operations=sorted(list(supported_ops))
+            supported_operations=self._supported_sorted
         )
 
-    def _find_backend(self, operation: str) -> Backend:
-        for backend in self.backends:
-            if backend.supports(operation):
-                return backend
-        return None
+    def _find_backend(self, operation: str) -> Optional[Backend]:
+        return find_backend(operation)
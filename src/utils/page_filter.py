@@ -1,31 +1,66 @@
 """Utility functions for page selection and filtering."""
 
-from typing import List
+import re
+from typing import List, Optional
 
+import numpy as np
 
-def parse_page_range(page_range: str) -> List[int]:
+# One "N" or "N-M" entry of a page range, with optional surrounding whitespace
+_PART_RE = re.compile(r"\s*(\d+)\s*(?:-\s*(\d+)\s*)?")
+
+
+def parse_page_range(page_range: str, max_page: Optional[int] = None) -> List[int]:
     """
     Parse page range string into list of page numbers.
 
     Args:
         page_range: Page range string (e.g., "1,3,5-10")
                    Pages are 1-indexed.
+        max_page: Optional upper bound; pages above it are dropped, which
+                  also bounds the work done for oversized ranges
 
     Returns:
-        List of page numbers (1-indexed)
+        Sorted, de-duplicated list of page numbers (1-indexed)
+
+    Raises:
+        ValueError: If the string is malformed or a range has start > end
     """
-    pages = set()
-
-    for part in page_range.split(','):
-        part = part.strip()
-        if '-' in part:
-            start, end = part.split('-', 1)
-            start = int(start.strip())
-            end = int(end.strip())
-            if start > end:
-                raise ValueError(f"Invalid page range: {part} (start > end)")
-            pages.update(range(start, end + 1))
-        else:
-            pages.add(int(part))
-
-    return sorted(list(pages))
+    parts = page_range.split(',')
+
+    # Fast path for the common single page / plain page list cases
+    stripped = [part.strip() for part in parts]
+    if all(part.isdecimal() for part in stripped):
+        pages = {int(part) for part in stripped}
+        if max_page is not None:
+            pages = {p for p in pages if p <= max_page}
+        return sorted(pages)
+
+    # Scan "N" / "N-M" entries separated by commas, marking pages in a mask
+    spans = []
+    pos = 0
+    while True:
+        match = _PART_RE.match(page_range, pos)
+        if match is None:
+            raise ValueError(f"Invalid page range: {page_range!r}")
+        start = int(match.group(1))
+        end = int(match.group(2)) if match.group(2) is not None else start
+        if start > end:
+            raise ValueError(f"Invalid page range: {match.group(0).strip()} (start > end)")
+        spans.append((start, end))
+
+        pos = match.end()
+        if pos == len(page_range):
+            break
+        if page_range[pos] != ',':
+            raise ValueError(f"Invalid page range: {page_range!r}")
+        pos += 1
+
+    upper = max(end for _, end in spans)
+    if max_page is not None:
+        upper = min(upper, max_page)
+
+    mask = np.zeros(max(upper, 0) + 1, dtype=bool)
+    for start, end in spans:
+        mask[start:end + 1] = True
+
+    return np.flatnonzero(mask).tolist()
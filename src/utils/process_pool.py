@@ -0,0 +1,186 @@
+"""Shared process pool for spreading per-page PDF work across CPU cores."""
+
+import multiprocessing
+import os
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional, Tuple, Union
+
+import pymupdf
+
+from ..config import get_config
+
+# A document handed to page segments: raw PDF bytes, or the path of a
+# spooled_document() file
+DocumentSource = Union[bytes, str]
+
+# PyMuPDF is not thread-safe, so page work is fanned out to worker processes
+# that each open their own Document. The pool is created once, lazily, with
+# the configured worker count and reused across requests to amortize
+# interpreter startup; callers bound their parallelism by how many segments
+# they submit, never by resizing the pool.
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+# Set in pool workers, where fanning out again would wait on the same pool
+_in_worker = False
+
+# Worker-side: the last spooled document opened, kept for its next segments
+_spooled_document: Optional[Tuple[str, Any]] = None
+
+
+def _mark_worker() -> None:
+    """Pool initializer flagging the current process as a pool worker."""
+    global _in_worker
+    _in_worker = True
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Get the shared process pool, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=max(get_config().extraction.extraction_workers, 1),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_mark_worker,
+            )
+        return _executor
+
+
+def _discard_executor(executor: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next get_executor() call builds a fresh one."""
+    global _executor
+    with _executor_lock:
+        # Another caller may already have replaced it
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def parallel_segments(page_count: int, data_size: int = 0) -> int:
+    """
+    Decide how many pool segments to split a run of pages into.
+
+    Runs of at least PARALLEL_MIN_PAGES pages are split across the workers.
+    Shorter runs of a document of at least PROCESS_MIN_BYTES go to a single
+    worker, which keeps heavy pages off the caller's thread (and the GIL)
+    without a second parse just to count pages. Returns 0 when the pages
+    should be processed in-process instead: with a single configured
+    worker, for small short documents, or inside a pool worker, where
+    fanning out again would wait on the same pool.
+    """
+    if _in_worker or page_count < 1:
+        return 0
+    extraction = get_config().extraction
+    if extraction.extraction_workers <= 1:
+        return 0
+    if page_count >= extraction.parallel_min_pages:
+        return min(extraction.extraction_workers, page_count)
+    if data_size >= extraction.process_min_bytes:
+        return 1
+    return 0
+
+
+@contextmanager
+def spooled_document(data: bytes) -> Iterator[str]:
+    """
+    Write a document to a temporary file for the duration of a request.
+
+    Segments of a document mapped more than once (one map per ndjson chunk)
+    can then be sent its path rather than pickling the bytes every time,
+    and each worker opens it only once. Paths are unique per call, so a
+    worker never mistakes a new document for one it already has open.
+    """
+    path = os.path.join(tempfile.gettempdir(), f"pymupdf-{uuid.uuid4().hex}.pdf")
+    with open(path, "xb") as f:
+        f.write(data)
+    try:
+        yield path
+    finally:
+        os.unlink(path)
+
+
+def document_size(source: DocumentSource) -> int:
+    """Size in bytes of a document source, for parallel_segments()."""
+    return os.path.getsize(source) if isinstance(source, str) else len(source)
+
+
+@contextmanager
+def segment_document(source: DocumentSource) -> Iterator[Any]:
+    """
+    Open the document a page segment works on.
+
+    Bytes are opened privately and closed afterwards. A spooled path is
+    opened once per worker and kept open for later segments of the same
+    document, replacing whichever spooled document the worker had before.
+    """
+    global _spooled_document
+    if not isinstance(source, str):
+        doc = pymupdf.open(stream=source, filetype="pdf")
+        try:
+            yield doc
+        finally:
+            doc.close()
+        return
+
+    if _spooled_document is None or _spooled_document[0] != source:
+        if _spooled_document is not None:
+            _spooled_document[1].close()
+            _spooled_document = None
+        _spooled_document = (source, pymupdf.open(source, filetype="pdf"))
+    yield _spooled_document[1]
+
+
+def map_page_segments(
+    fn: Callable[..., List[Any]],
+    data: DocumentSource,
+    page_numbers: List[int],
+    segments: int,
+    *args: Any,
+) -> List[Any]:
+    """
+    Run ``fn(data, segment, *args)`` over contiguous page segments in parallel.
+
+    Pages are split into at most ``segments`` segments so in-flight work (and
+    the PDF copies sent to workers, each of which opens its own Document)
+    stays bounded by that count; the shared pool itself keeps its configured
+    size. Use parallel_segments() to decide whether to call this at all.
+
+    Args:
+        fn: Module-level function returning one result per page in its
+            segment; it opens ``data`` with segment_document()
+        data: Raw PDF bytes, or a spooled_document() path to avoid sending
+              the bytes again when the same document is mapped repeatedly
+        page_numbers: Pages to process (1-indexed), in output order
+        segments: Number of segments to split the pages into
+
+    Returns:
+        Flattened per-page results in the order of page_numbers
+    """
+    segment_size = -(-len(page_numbers) // segments)
+    page_segments = [
+        page_numbers[i:i + segment_size]
+        for i in range(0, len(page_numbers), segment_size)
+    ]
+
+    # If a worker died (OOM, a crash inside MuPDF) the pool is unusable from
+    # then on, so it is replaced and the map retried once on the new pool
+    for attempt in range(2):
+        executor = get_executor()
+        try:
+            futures = [executor.submit(fn, data, segment, *args) for segment in page_segments]
+
+            # Collect in submission order to preserve page ordering
+            results = []
+            for future in futures:
+                results.extend(future.result())
+            return results
+        except BrokenProcessPool:
+            _discard_executor(executor)
+            if attempt:
+                raise
@@ -0,0 +1,33 @@
+"""Shared pytest fixtures."""
+
+import pytest
+
+from src.backends import get_backend_map, get_backends
+from src.config import reload_config
+
+
+def _reset_shared_state() -> None:
+    """Rebuild the global config and drop the shared backends built from it."""
+    reload_config()
+    get_backend_map.cache_clear()
+    get_backends.cache_clear()
+
+
+@pytest.fixture
+def config_env():
+    """
+    Override configuration environment variables for one test.
+
+    Yields a function taking ``NAME=value`` overrides; each call reloads the
+    global config and clears the shared backends so they are rebuilt from
+    it. The environment, config and backends are restored on teardown, so
+    tests stay independent of order (and of which xdist worker runs them).
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        def apply(**env) -> None:
+            for name, value in env.items():
+                mp.setenv(name, str(value))
+            _reset_shared_state()
+
+        yield apply
+    _reset_shared_state()
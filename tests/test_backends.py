@@ -1,12 +1,22 @@
 """Tests for PDF processing backends."""
 
+import base64
 import json
+import os
+import signal
+import time
+from concurrent.futures.process import BrokenProcessPool
+
 import pytest
 import pymupdf
 
+from src.backends import find_backend, get_backends, text_extraction
 from src.backends.text_extraction import TextExtractionBackend
 from src.backends.text_layer_detection import TextLayerDetectionBackend
 from src.utils.page_filter import parse_page_range
+from src.backends.text_layer_detection import _count_segment
+from src.utils import process_pool
+from src.utils.process_pool import get_executor, map_page_segments, parallel_segments
 
 
 def create_test_pdf(pages=None):
@@ -107,6 +117,43 @@ def create_table_pdf():
     return pdf_bytes
 
 
+def create_scanned_pdf():
+    """Create a test PDF whose second page holds only an image (no text layer)."""
+    doc = pymupdf.open()
+
+    page = doc.new_page(width=612, height=792)
+    page.insert_text(
+        pymupdf.Point(72, 72),
+        "This page has a real text layer with more than enough characters to count.",
+        fontsize=12,
+        fontname="helv",
+    )
+
+    pix = pymupdf.Pixmap(pymupdf.csRGB, pymupdf.IRect(0, 0, 64, 64), False)
+    pix.clear_with(200)
+    page = doc.new_page(width=612, height=792)
+    page.insert_image(pymupdf.Rect(72, 72, 540, 720), pixmap=pix)
+
+    pdf_bytes = doc.tobytes()
+    doc.close()
+    return pdf_bytes
+
+
+def create_cover_pdf():
+    """Create a test PDF with a short title line and a small logo image."""
+    doc = pymupdf.open()
+    page = doc.new_page(width=612, height=792)
+    page.insert_text(pymupdf.Point(72, 300), "Annual Report 2024", fontsize=24, fontname="helv")
+
+    pix = pymupdf.Pixmap(pymupdf.csRGB, pymupdf.IRect(0, 0, 40, 40), False)
+    pix.clear_with(120)
+    page.insert_image(pymupdf.Rect(72, 72, 112, 112), pixmap=pix)
+
+    pdf_bytes = doc.tobytes()
+    doc.close()
+    return pdf_bytes
+
+
 # --- Page Filter Tests ---
 
 class TestPageFilter:
@@ -124,6 +171,25 @@ class TestPageFilter:
     def test_parse_mixed_format(self):
         assert parse_page_range("1,3,5-7") == [1, 3, 5, 6, 7]
 
+    def test_parse_unsorted_duplicates(self):
+        assert parse_page_range(" 5, 1,3,1 ") == [1, 3, 5]
+
+    def test_parse_invalid_page(self):
+        with pytest.raises(ValueError):
+            parse_page_range("1,x")
+
+    def test_parse_overlapping_ranges(self):
+        assert parse_page_range("5-7, 1-2 ,6-8") == [1, 2, 5, 6, 7, 8]
+
+    def test_parse_max_page(self):
+        assert parse_page_range("2,4-1000000000", max_page=6) == [2, 4, 5, 6]
+        assert parse_page_range("1,9", max_page=3) == [1]
+
+    def test_parse_malformed(self):
+        for bad in ("", "1,", "1;3", "1-", "1-3-5", "a-3"):
+            with pytest.raises(ValueError):
+                parse_page_range(bad)
+
     def test_parse_invalid_range(self):
         with pytest.raises(ValueError):
             parse_page_range("10-5")
@@ -144,6 +210,14 @@ class TestBackendSupport:
         assert backend.supports("detect_text_layer")
         assert not backend.supports("extract")
 
+    def test_find_backend_shared(self):
+        """Operations should resolve to the shared backend instances."""
+        backends = get_backends()
+        assert get_backends() is backends
+        assert find_backend("extract") is backends[0]
+        assert find_backend("detect_text_layer") is backends[1]
+        assert find_backend("nonexistent_op") is None
+
 
 # --- Text Extraction Tests ---
 
@@ -229,6 +303,164 @@ class TestTextExtractionBackend:
         result = json.loads(output)
         assert metadata["pages_processed"] == "2"
 
+    def test_extract_page_range_out_of_bounds(self):
+        """Out-of-range pages should be ignored."""
+        pages = [
+            {"items": [{"text": "Page 1 content", "fontsize": 12, "y": 72}]},
+            {"items": [{"text": "Page 2 content", "fontsize": 12, "y": 72}]},
+        ]
+        pdf = create_test_pdf(pages)
+        output, fmt, metadata = self.backend.process(
+            pdf, "extract", {"output_format": "json", "pages": "0,2,5-7"}
+        )
+
+        result = json.loads(output)
+        assert metadata["pages_processed"] == "1"
+        assert [p["page_number"] for p in result["paragraphs"]] == [2]
+
+    def test_extract_ndjson_chunks(self):
+        """NDJSON output should emit one assembled result per chunk of pages."""
+        pages = [
+            {"items": [{"text": f"Heading {i}", "fontsize": 16, "y": 72},
+                       {"text": f"Body text for page {i} of the chunked document.", "fontsize": 12, "y": 120}]}
+            for i in range(1, 6)
+        ]
+        pdf = create_test_pdf(pages)
+        full, _, _ = self.backend.process(pdf, "extract", {"output_format": "json"})
+        output, fmt, metadata = self.backend.process(
+            pdf, "extract", {"output_format": "ndjson", "chunk_pages": "2"}
+        )
+
+        assert fmt == "ndjson"
+        assert metadata["chunks"] == "3"
+        chunks = [json.loads(line) for line in output.decode("utf-8").splitlines()]
+        assert [(c["chunk"]["first_page"], c["chunk"]["last_page"]) for c in chunks] == [(1, 2), (3, 4), (5, 5)]
+
+        # IDs and roles should match a single-shot extraction
+        paragraphs = [p for c in chunks for p in c["paragraphs"]]
+        assert paragraphs == json.loads(full)["paragraphs"]
+
+    def test_extract_invalid_chunk_pages(self):
+        """Non-positive chunk sizes should be rejected."""
+        pdf = create_test_pdf()
+        with pytest.raises(ValueError):
+            self.backend.process(pdf, "extract", {"output_format": "ndjson", "chunk_pages": "0"})
+
+    def test_chunk_pages_ignored_outside_ndjson(self):
+        """Formats that don't chunk shouldn't fail on an invalid chunk_pages option."""
+        pdf = create_test_pdf()
+        for output_format in ("json", "html"):
+            _, fmt, _ = self.backend.process(
+                pdf, "extract", {"output_format": output_format, "chunk_pages": "0"}
+            )
+            assert fmt == output_format
+
+    def test_parallel_extraction_matches_sequential(self, config_env):
+        """Process-pool extraction should produce the same result as the sequential path."""
+        pages = [
+            {"items": [{"text": f"Page {i} heading", "fontsize": 16, "y": 72},
+                       {"text": f"Body text on page {i}.", "fontsize": 12, "y": 120}]}
+            for i in range(1, 5)
+        ]
+        pdf = create_test_pdf(pages)
+
+        config_env(EXTRACTION_WORKERS=1)
+        sequential, _, _ = self.backend.process(pdf, "extract", {"output_format": "json"})
+
+        config_env(EXTRACTION_WORKERS=2, PARALLEL_MIN_PAGES=2)
+        parallel, _, metadata = self.backend.process(pdf, "extract", {"output_format": "json"})
+
+        assert metadata["pages_processed"] == "4"
+        assert json.loads(parallel) == json.loads(sequential)
+        ids = [p["id"] for p in json.loads(parallel)["paragraphs"]]
+        assert ids == [f"para-{n}" for n in range(len(ids))]
+
+    def test_cover_page_with_logo_not_scanned(self):
+        """Short text next to a small image should be extracted, not skipped as scanned."""
+        output, _, metadata = self.backend.process(
+            create_cover_pdf(), "extract", {"output_format": "json"}
+        )
+
+        result = json.loads(output)
+        assert metadata["pages_skipped_scanned"] == "0"
+        assert [p["content"] for p in result["paragraphs"]] == ["Annual Report 2024"]
+
+    def test_parallel_ndjson_matches_sequential(self, config_env, monkeypatch):
+        """Chunks and roles should not change when the passes run in workers from a spooled file."""
+        pages = [
+            {"items": [{"text": f"Page {i} heading", "fontsize": 16, "y": 72},
+                       {"text": f"Body text on page {i} of the document.", "fontsize": 12, "y": 120}]}
+            for i in range(1, 5)
+        ]
+        pdf = create_test_pdf(pages)
+        options = {"output_format": "ndjson", "chunk_pages": "3"}
+
+        config_env(EXTRACTION_WORKERS=1)
+        sequential, _, _ = self.backend.process(pdf, "extract", options)
+
+        sources = []
+
+        def recording_map(fn, data, page_numbers, segments, *args):
+            sources.append(data)
+            return map_page_segments(fn, data, page_numbers, segments, *args)
+
+        monkeypatch.setattr(text_extraction, "map_page_segments", recording_map)
+        config_env(EXTRACTION_WORKERS=2, PARALLEL_MIN_PAGES=2)
+        parallel, _, metadata = self.backend.process(pdf, "extract", options)
+
+        assert metadata["chunks"] == "2"
+        assert parallel == sequential
+        assert parallel.endswith(b"\n")
+
+        # Histogram pass and first chunk share one spooled file, removed afterwards
+        assert len(sources) == 2
+        assert isinstance(sources[0], str) and sources[1] == sources[0]
+        assert not os.path.exists(sources[0])
+
+    def test_scanned_pages_skipped(self):
+        """Image-only pages should skip text/table extraction and be reported."""
+        pdf = create_scanned_pdf()
+        output, fmt, metadata = self.backend.process(
+            pdf, "extract", {"output_format": "json", "include_images": "true"}
+        )
+
+        result = json.loads(output)
+        assert metadata["pages_processed"] == "2"
+        assert metadata["pages_skipped_scanned"] == "1"
+        assert {p["page_number"] for p in result["paragraphs"]} == {1}
+        assert [img["page_number"] for img in result["images"]] == [2]
+        assert base64.b64decode(result["images"][0]["data"], validate=True)
+
+    def test_repeated_image_extracted_once(self, monkeypatch):
+        """An image shared across pages should be decoded once but reported per page."""
+        pix = pymupdf.Pixmap(pymupdf.csRGB, pymupdf.IRect(0, 0, 32, 32), False)
+        pix.clear_with(128)
+        doc = pymupdf.open()
+        xref = 0
+        for i in range(3):
+            page = doc.new_page(width=612, height=792)
+            page.insert_text(pymupdf.Point(72, 72), f"Page {i + 1} with a shared logo image.", fontsize=12)
+            xref = page.insert_image(pymupdf.Rect(72, 600, 136, 664), pixmap=pix, xref=xref)
+        pdf = doc.tobytes()
+        doc.close()
+
+        calls = []
+        original = pymupdf.Document.extract_image
+
+        def counting_extract_image(self, xref):
+            calls.append(xref)
+            return original(self, xref)
+
+        monkeypatch.setattr(pymupdf.Document, "extract_image", counting_extract_image)
+        output, _, _ = self.backend.process(
+            pdf, "extract", {"output_format": "json", "include_images": "true"}
+        )
+
+        result = json.loads(output)
+        assert [img["page_number"] for img in result["images"]] == [1, 2, 3]
+        assert [img["id"] for img in result["images"]] == ["img-0", "img-1", "img-2"]
+        assert len(calls) == 1
+
     def test_extract_metadata(self):
         """Metadata should include processing stats."""
         pdf = create_test_pdf()
@@ -274,6 +506,23 @@ class TestTextLayerDetectionBackend:
         assert len(result["pages"]) == 2
         assert all(p["has_text_layer"] for p in result["pages"])
 
+    def test_parallel_detection_matches_sequential(self, config_env):
+        """Process-pool detection should report the same per-page counts."""
+        pages = [
+            {"items": [{"text": "Enough text on this page to pass the detection threshold easily.", "y": 72}]},
+            {"items": [{"text": "Short", "y": 72}]},
+            {"items": []},
+            {"items": [{"text": "Another page with a comfortably long line of extractable text.", "y": 72}]},
+        ]
+        pdf = create_test_pdf(pages)
+        sequential, _, _ = self.backend.process(pdf, "detect_text_layer", {})
+
+        config_env(EXTRACTION_WORKERS=2, PARALLEL_MIN_PAGES=2)
+        parallel, _, metadata = self.backend.process(pdf, "detect_text_layer", {})
+
+        assert json.loads(parallel) == json.loads(sequential)
+        assert metadata["pages_with_text"] == "2"
+
     def test_detect_metadata(self):
         """Metadata should include summary statistics."""
         pdf = create_test_pdf()
@@ -299,3 +548,57 @@ class TestTableExtraction:
         # quality of the drawn grid. At minimum, text should be extracted.
         assert "tables" in result
         assert "paragraphs" in result
+        for table in result["tables"]:
+            assert "cells_soa" not in table
+            assert len(table["cells"]) == table["rows"] * table["columns"]
+            assert all(cell["row_span"] == 1 for cell in table["cells"])
+
+
+# --- Process Pool Tests ---
+
+class TestProcessPool:
+    """Tests for the shared page-segment process pool."""
+
+    def test_pool_reused_across_segment_counts(self):
+        """Different segment counts should share one pool rather than rebuild it."""
+        pages = [{"items": [{"text": f"Page {i} text", "y": 72}]} for i in range(1, 5)]
+        pdf = create_test_pdf(pages)
+
+        executor = get_executor()
+        for workers in (4, 3, 1, 2, 4):
+            counts = map_page_segments(_count_segment, pdf, [1, 2, 3, 4], workers)
+            assert counts == [len(f"Page {i} text") for i in range(1, 5)]
+            assert get_executor() is executor
+
+    def test_parallel_segments_thresholds(self, config_env, monkeypatch):
+        """Segment counts should follow the worker, page and size thresholds, and be 0 in workers."""
+        config_env(EXTRACTION_WORKERS=4, PARALLEL_MIN_PAGES=3, PROCESS_MIN_BYTES=1000)
+        assert parallel_segments(2) == 0
+        assert parallel_segments(2, 1000) == 1
+        assert parallel_segments(3) == 3
+        assert parallel_segments(100) == 4
+
+        monkeypatch.setattr(process_pool, "_in_worker", True)
+        assert parallel_segments(100) == 0
+
+    def test_pool_recovers_after_worker_killed(self):
+        """A worker dying should not leave the pool unusable for later requests."""
+        pages = [{"items": [{"text": f"Page {i} text", "y": 72}]} for i in range(1, 5)]
+        pdf = create_test_pdf(pages)
+
+        executor = get_executor()
+        os.kill(executor.submit(os.getpid).result(), signal.SIGKILL)
+        # Wait for the pool to notice the dead worker and mark itself broken
+        for _ in range(50):
+            try:
+                executor.submit(os.getpid).result()
+            except BrokenProcessPool:
+                break
+            time.sleep(0.1)
+        else:
+            pytest.fail("pool never noticed the killed worker")
+
+        counts = map_page_segments(_count_segment, pdf, [1, 2, 3, 4], 2)
+        assert counts == [len(f"Page {i} text") for i in range(1, 5)]
+        assert get_executor() is not executor
+
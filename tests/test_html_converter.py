@@ -3,62 +3,44 @@
 import pytest
 from src.converters.html_converter import HtmlConverter
 
+# Empty result skeleton; tests build on it with {**_EMPTY, ...} and never mutate it
+_EMPTY = {"paragraphs": [], "tables": [], "images": [], "content_blocks": []}
 
-class TestHtmlConverter:
-    """Tests for HtmlConverter."""
 
-    def setup_method(self):
-        self.converter = HtmlConverter()
+@pytest.fixture(scope="class")
+def converter():
+    """One converter per test class; it keeps no per-conversion state."""
+    return HtmlConverter()
 
-    def test_basic_paragraph(self):
-        """Body paragraphs should render as <p> tags."""
-        result = {
-            "paragraphs": [
-                {"id": "para-0", "content": "Hello world", "role": None},
-            ],
-            "tables": [],
-            "images": [],
-            "content_blocks": [
-                {"type": "paragraph", "page": 1, "y_position": 0, "content_id": "para-0"},
-            ],
-        }
-        html = self.converter.convert(result)
-        assert "<p>Hello world</p>" in html
 
-    def test_title_renders_h1(self):
-        """Title role should render as <h1>."""
-        result = {
-            "paragraphs": [
-                {"id": "para-0", "content": "My Title", "role": "title"},
-            ],
-            "tables": [],
-            "images": [],
-            "content_blocks": [
-                {"type": "paragraph", "page": 1, "y_position": 0, "content_id": "para-0"},
-            ],
-        }
-        html = self.converter.convert(result)
-        assert "<h1>My Title</h1>" in html
+class TestHtmlConverter:
+    """Tests for HtmlConverter."""
 
-    def test_heading_renders_h2(self):
-        """sectionHeading role should render as <h2>."""
+    @pytest.mark.parametrize("role,content,expected", [
+        (None, "Hello world", "<p>Hello world</p>"),
+        ("title", "My Title", "<h1>My Title</h1>"),
+        ("sectionHeading", "Section One", "<h2>Section One</h2>"),
+        (None, "a < b & c > d", "<p>a &lt; b &amp; c &gt; d</p>"),
+        (None, 'say "hi" & \'bye\'', "<p>say &quot;hi&quot; &amp; &#039;bye&#039;</p>"),
+    ])
+    def test_paragraph_roles(self, converter, role, content, expected):
+        """Paragraphs should render with their role's tag and escaped content."""
         result = {
+            **_EMPTY,
             "paragraphs": [
-                {"id": "para-0", "content": "Section One", "role": "sectionHeading"},
+                {"id": "para-0", "content": content, "role": role},
             ],
-            "tables": [],
-            "images": [],
             "content_blocks": [
                 {"type": "paragraph", "page": 1, "y_position": 0, "content_id": "para-0"},
             ],
         }
-        html = self.converter.convert(result)
-        assert "<h2>Section One</h2>" in html
+        html = converter.convert(result)
+        assert expected in html
 
-    def test_table_rendering(self):
+    def test_table_rendering(self, converter):
         """Tables should render with proper HTML structure."""
         result = {
-            "paragraphs": [],
+            **_EMPTY,
             "tables": [
                 {
                     "id": "table-0",
@@ -73,69 +55,78 @@ class TestHtmlConverter:
                     ],
                 }
             ],
-            "images": [],
             "content_blocks": [
                 {"type": "table", "page": 1, "y_position": 0, "content_id": "table-0"},
             ],
         }
-        html = self.converter.convert(result)
+        html = converter.convert(result)
         assert '<table border="1" id="table-0">' in html
         assert "<th>Name</th>" in html
         assert "<th>Age</th>" in html
         assert "<td>Alice</td>" in html
         assert "<td>30</td>" in html
 
-    def test_html_escaping(self):
-        """Special characters should be escaped."""
+    def test_table_rendering_from_soa_cells(self, converter):
+        """Tables carrying parallel cell arrays should render like per-cell dicts."""
         result = {
-            "paragraphs": [
-                {"id": "para-0", "content": "a < b & c > d", "role": None},
+            **_EMPTY,
+            "tables": [
+                {
+                    "id": "table-0",
+                    "page_number": 1,
+                    "rows": 2,
+                    "columns": 2,
+                    "cells": None,
+                    "cells_soa": {
+                        "row_index": [0, 0, 1, 1],
+                        "column_index": [0, 1, 0, 1],
+                        "content": ["Name", "Age", "Alice", "30"],
+                        "kind": ["columnHeader", "columnHeader", "content", "content"],
+                    },
+                }
             ],
-            "tables": [],
-            "images": [],
             "content_blocks": [
-                {"type": "paragraph", "page": 1, "y_position": 0, "content_id": "para-0"},
+                {"type": "table", "page": 1, "y_position": 0, "content_id": "table-0"},
             ],
         }
-        html = self.converter.convert(result)
-        assert "a &lt; b &amp; c &gt; d" in html
+        html = converter.convert(result)
+        assert (
+            '<table border="1" id="table-0"><tbody>'
+            "<tr><th>Name</th><th>Age</th></tr>"
+            "<tr><td>Alice</td><td>30</td></tr>"
+            "</tbody></table>"
+        ) in html
 
-    def test_content_block_ordering(self):
+    def test_content_block_ordering(self, converter):
         """Content should be rendered in content_blocks order."""
         result = {
+            **_EMPTY,
             "paragraphs": [
                 {"id": "para-0", "content": "First", "role": None},
                 {"id": "para-1", "content": "Second", "role": None},
             ],
-            "tables": [],
-            "images": [],
             "content_blocks": [
                 {"type": "paragraph", "page": 1, "y_position": 0, "content_id": "para-0"},
                 {"type": "paragraph", "page": 1, "y_position": 100, "content_id": "para-1"},
             ],
         }
-        html = self.converter.convert(result)
-        first_pos = html.index("First")
-        second_pos = html.index("Second")
-        assert first_pos < second_pos
+        html = converter.convert(result)
+        assert html == (
+            '<html><head><meta charset="utf-8"></head><body>'
+            "<p>First</p><p>Second</p>"
+            "</body></html>"
+        )
 
-    def test_html_wrapper(self):
+    def test_html_wrapper(self, converter):
         """Output should have proper HTML wrapper."""
-        result = {
-            "paragraphs": [],
-            "tables": [],
-            "images": [],
-            "content_blocks": [],
-        }
-        html = self.converter.convert(result)
-        assert html.startswith('<html><head><meta charset="utf-8"></head><body>')
-        assert html.endswith('</body></html>')
+        result = _EMPTY
+        html = converter.convert(result)
+        assert html == '<html><head><meta charset="utf-8"></head><body></body></html>'
 
-    def test_image_rendering(self):
+    def test_image_rendering(self, converter):
         """Images should render as base64 img tags."""
         result = {
-            "paragraphs": [],
-            "tables": [],
+            **_EMPTY,
             "images": [
                 {"id": "img-0", "data": "abc123", "mime_type": "image/png"},
             ],
@@ -143,5 +134,24 @@ class TestHtmlConverter:
                 {"type": "image", "page": 1, "y_position": 50, "content_id": "img-0"},
             ],
         }
-        html = self.converter.convert(result)
+        html = converter.convert(result)
         assert '<img src="data:image/png;base64,abc123" />' in html
+
+    def test_repeated_image_rendering(self, converter):
+        """Images sharing a payload should each render their own tag."""
+        result = {
+            **_EMPTY,
+            "images": [
+                {"id": "img-0", "data": "abc123", "mime_type": "image/png"},
+                {"id": "img-1", "data": "abc123", "mime_type": "image/png"},
+                {"id": "img-2", "data": "abc123", "mime_type": "image/jpeg"},
+            ],
+            "content_blocks": [
+                {"type": "image", "page": 1, "y_position": 50, "content_id": "img-0"},
+                {"type": "image", "page": 2, "y_position": 50, "content_id": "img-1"},
+                {"type": "image", "page": 3, "y_position": 50, "content_id": "img-2"},
+            ],
+        }
+        html = converter.convert(result)
+        assert html.count('<img src="data:image/png;base64,abc123" />') == 2
+        assert html.count('<img src="data:image/jpeg;base64,abc123" />') == 1
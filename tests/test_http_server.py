@@ -1,17 +1,25 @@
 """Tests for HTTP server endpoints."""
 
 import base64
-import json
+import orjson
 import pytest
 import pymupdf
 
 from fastapi.testclient import TestClient
 
+from src.backends import text_extraction
 from src.http_server import create_app
+from src.utils.process_pool import map_page_segments
 
 
-def create_test_pdf_bytes():
-    """Create a simple test PDF."""
+def _json(response):
+    """Decode a response body with orjson, which is much faster on large extract results."""
+    return orjson.loads(response.content)
+
+
+@pytest.fixture(scope="session")
+def sample_pdf_bytes():
+    """Build the simple test PDF once per session."""
     doc = pymupdf.open()
     page = doc.new_page(width=612, height=792)
     page.insert_text(pymupdf.Point(72, 72), "Test Title", fontsize=24, fontname="hebo")
@@ -22,9 +30,27 @@ def create_test_pdf_bytes():
     return pdf_bytes
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def sample_pdf_b64(sample_pdf_bytes):
+    """Base64 form of the simple test PDF for /process requests."""
+    return base64.b64encode(sample_pdf_bytes).decode("utf-8")
+
+
+@pytest.fixture(scope="session")
+def multipage_pdf_bytes():
+    """Build a three-page PDF with one line of text per page once per session."""
+    doc = pymupdf.open()
+    for i in range(3):
+        page = doc.new_page()
+        page.insert_text(pymupdf.Point(72, 72), f"Page {i+1}", fontsize=12)
+    pdf_bytes = doc.tobytes()
+    doc.close()
+    return pdf_bytes
+
+
+@pytest.fixture(scope="session")
 def client():
-    """Create test client."""
+    """Create a test client shared by all tests; none of them change app state."""
     app = create_app()
     return TestClient(app)
 
@@ -36,25 +62,24 @@ class TestHealthEndpoint:
         response = client.get("/health")
         assert response.status_code == 200
 
-        data = response.json()
+        data = _json(response)
         assert data["status"] == "ok"
         assert "operations" in data
         assert isinstance(data["operations"], list)
-        assert "extract" in data["operations"]
-        assert "detect_text_layer" in data["operations"]
+        assert {"extract", "detect_text_layer"}.issubset(data["operations"])
 
     def test_ready_check(self, client):
         response = client.get("/ready")
         assert response.status_code == 200
-        assert response.json()["status"] == "ready"
+        assert _json(response)["status"] == "ready"
 
 
 class TestExtractEndpoint:
     """Tests for POST /api/extract endpoint."""
 
-    def test_extract_json(self, client):
+    def test_extract_json(self, client, sample_pdf_bytes):
         """Extract from PDF should return JSON result."""
-        pdf = create_test_pdf_bytes()
+        pdf = sample_pdf_bytes
         response = client.post(
             "/api/extract",
             files={"file": ("test.pdf", pdf, "application/pdf")},
@@ -62,16 +87,16 @@ class TestExtractEndpoint:
         )
 
         assert response.status_code == 200
-        data = response.json()
+        data = _json(response)
         assert data["success"] is True
         assert "result" in data
         assert "paragraphs" in data["result"]
         assert "content_blocks" in data["result"]
         assert data["result"]["model_used"] == "pymupdf"
 
-    def test_extract_html(self, client):
+    def test_extract_html(self, client, sample_pdf_bytes):
         """Extract from PDF should return HTML when requested."""
-        pdf = create_test_pdf_bytes()
+        pdf = sample_pdf_bytes
         response = client.post(
             "/api/extract",
             files={"file": ("test.pdf", pdf, "application/pdf")},
@@ -79,55 +104,143 @@ class TestExtractEndpoint:
         )
 
         assert response.status_code == 200
-        data = response.json()
+        data = _json(response)
         assert data["success"] is True
         assert data["format"] == "text/html"
         assert "<html>" in data["result"]
         assert "</html>" in data["result"]
 
-    def test_extract_has_roles(self, client):
+    def test_extract_html_raw(self, client, sample_pdf_bytes):
+        """Accepting text/html should return the HTML body without the JSON envelope."""
+        pdf = sample_pdf_bytes
+        response = client.post(
+            "/api/extract",
+            files={"file": ("test.pdf", pdf, "application/pdf")},
+            data={"output_format": "html"},
+            headers={"Accept": "text/html"},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/html")
+        assert response.text.startswith("<html>")
+        assert orjson.loads(response.headers["x-metadata"])["pages_processed"] == "1"
+        assert int(response.headers["x-processing-time-ms"]) >= 0
+
+    def test_extract_html_raw_case_insensitive(self, client, sample_pdf_bytes):
+        """Accept media types should match regardless of case."""
+        response = client.post(
+            "/api/extract",
+            files={"file": ("test.pdf", sample_pdf_bytes, "application/pdf")},
+            data={"output_format": "html"},
+            headers={"Accept": "Text/HTML"},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/html")
+
+    @pytest.mark.parametrize("accept", ["text/html;q=0", "text/html; q=0.0, application/json"])
+    def test_extract_html_refused(self, client, sample_pdf_bytes, accept):
+        """A q=0 text/html range should keep the JSON envelope."""
+        response = client.post(
+            "/api/extract",
+            files={"file": ("test.pdf", sample_pdf_bytes, "application/pdf")},
+            data={"output_format": "html"},
+            headers={"Accept": accept},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/json")
+        data = _json(response)
+        assert data["success"] is True
+        assert data["result"].startswith("<html>")
+
+    def test_extract_has_roles(self, client, sample_pdf_bytes):
         """Extracted paragraphs should have semantic roles."""
-        pdf = create_test_pdf_bytes()
+        pdf = sample_pdf_bytes
         response = client.post(
             "/api/extract",
             files={"file": ("test.pdf", pdf, "application/pdf")},
             data={"output_format": "json"},
         )
 
-        data = response.json()
+        data = _json(response)
         roles = [p["role"] for p in data["result"]["paragraphs"]]
         assert any(r is not None for r in roles)
 
-    def test_extract_with_page_range(self, client):
+    def test_extract_with_page_range(self, client, multipage_pdf_bytes):
         """Page range should limit extraction."""
-        # Create multi-page PDF
+        response = client.post(
+            "/api/extract",
+            files={"file": ("test.pdf", multipage_pdf_bytes, "application/pdf")},
+            data={"output_format": "json", "pages": "1,3"},
+        )
+
+        assert response.status_code == 200
+        data = _json(response)
+        assert data["metadata"]["pages_processed"] == "2"
+        assert [p["content"] for p in data["result"]["paragraphs"]] == ["Page 1", "Page 3"]
+
+    def test_extract_with_page_range_past_end(self, client, multipage_pdf_bytes):
+        """Pages beyond the end of the document should be ignored."""
+        response = client.post(
+            "/api/extract",
+            files={"file": ("test.pdf", multipage_pdf_bytes, "application/pdf")},
+            data={"output_format": "json", "pages": "2-10"},
+        )
+
+        assert response.status_code == 200
+        data = _json(response)
+        assert data["metadata"]["pages_processed"] == "2"
+        assert data["result"]["pages"] == 2
+
+    def test_extract_ndjson_chunk_pages(self, client, multipage_pdf_bytes):
+        """chunk_pages should control the number of ndjson lines."""
+        pdf = multipage_pdf_bytes
+
+        response = client.post(
+            "/api/extract",
+            files={"file": ("test.pdf", pdf, "application/pdf")},
+            data={"output_format": "ndjson", "chunk_pages": "2"},
+        )
+
+        assert response.status_code == 200
+        data = _json(response)
+        assert data["format"] == "application/x-ndjson"
+        assert len(data["result"].splitlines()) == 2
+
+    def test_extract_gzip(self, client):
+        """Large responses should be gzip-compressed when the client accepts it."""
         doc = pymupdf.open()
-        for i in range(3):
+        for i in range(20):
             page = doc.new_page()
-            page.insert_text(pymupdf.Point(72, 72), f"Page {i+1}", fontsize=12)
+            page.insert_text(pymupdf.Point(72, 72), f"Page {i+1} body text", fontsize=12)
         pdf = doc.tobytes()
         doc.close()
 
         response = client.post(
             "/api/extract",
             files={"file": ("test.pdf", pdf, "application/pdf")},
-            data={"output_format": "json", "pages": "1,3"},
+            data={"output_format": "json"},
+            headers={"Accept-Encoding": "gzip"},
         )
 
         assert response.status_code == 200
-        data = response.json()
-        assert data["metadata"]["pages_processed"] == "2"
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(_json(response)["result"]["paragraphs"]) == 20
+
+        health = client.get("/health", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in health.headers
 
-    def test_extract_processing_time(self, client):
+    def test_extract_processing_time(self, client, sample_pdf_bytes):
         """Response should include processing time."""
-        pdf = create_test_pdf_bytes()
+        pdf = sample_pdf_bytes
         response = client.post(
             "/api/extract",
             files={"file": ("test.pdf", pdf, "application/pdf")},
             data={"output_format": "json"},
         )
 
-        data = response.json()
+        data = _json(response)
         assert "processing_time_ms" in data
         assert isinstance(data["processing_time_ms"], int)
 
@@ -135,16 +248,16 @@ class TestExtractEndpoint:
 class TestDetectTextLayerEndpoint:
     """Tests for POST /api/detect-text-layer endpoint."""
 
-    def test_detect_text_layer(self, client):
+    def test_detect_text_layer(self, client, sample_pdf_bytes):
         """Should detect text layer in a text PDF."""
-        pdf = create_test_pdf_bytes()
+        pdf = sample_pdf_bytes
         response = client.post(
             "/api/detect-text-layer",
             files={"file": ("test.pdf", pdf, "application/pdf")},
         )
 
         assert response.status_code == 200
-        data = response.json()
+        data = _json(response)
         assert data["success"] is True
         assert data["result"]["total_pages"] == 1
         assert data["result"]["pages"][0]["has_text_layer"] is True
@@ -153,19 +266,16 @@ class TestDetectTextLayerEndpoint:
 class TestProcessEndpoint:
     """Tests for POST /process (base64 mode)."""
 
-    def test_process_extract(self, client):
+    def test_process_extract(self, client, sample_pdf_b64):
         """Process endpoint should work with base64 PDF."""
-        pdf = create_test_pdf_bytes()
-        encoded = base64.b64encode(pdf).decode("utf-8")
-
         response = client.post("/process", json={
             "operation": "extract",
-            "data": encoded,
+            "data": sample_pdf_b64,
             "options": {"output_format": "json"},
         })
 
         assert response.status_code == 200
-        data = response.json()
+        data = _json(response)
         assert data["success"] is True
         assert "paragraphs" in data["result"]
 
@@ -179,36 +289,83 @@ class TestProcessEndpoint:
 
         assert response.status_code == 400
 
-    def test_process_unsupported_operation(self, client):
+    def test_process_unsupported_operation(self, client, sample_pdf_b64):
         """Unsupported operation should return 400."""
-        pdf = create_test_pdf_bytes()
-        encoded = base64.b64encode(pdf).decode("utf-8")
-
         response = client.post("/process", json={
             "operation": "nonexistent_op",
-            "data": encoded,
+            "data": sample_pdf_b64,
             "options": {},
         })
 
         assert response.status_code == 400
+        details = _json(response)["detail"]["error"]["details"]
+        assert details["supported_operations"] == ["detect_text_layer", "extract"]
 
-    def test_process_detect_text_layer(self, client):
+    def test_process_detect_text_layer(self, client, sample_pdf_b64):
         """Process endpoint should work for detect_text_layer operation."""
-        pdf = create_test_pdf_bytes()
-        encoded = base64.b64encode(pdf).decode("utf-8")
-
         response = client.post("/process", json={
             "operation": "detect_text_layer",
-            "data": encoded,
+            "data": sample_pdf_b64,
             "options": {},
         })
 
         assert response.status_code == 200
-        data = response.json()
+        data = _json(response)
         assert data["success"] is True
         assert data["result"]["total_pages"] == 1
 
 
+class TestProcessPoolDispatch:
+    """Tests for dispatching requests to worker processes."""
+
+    @pytest.fixture
+    def pool_client(self, config_env):
+        """Client whose app uses the process pool for documents of any size."""
+        config_env(EXTRACTION_WORKERS=2, PROCESS_MIN_BYTES=0, PARALLEL_MIN_PAGES=3)
+        return TestClient(create_app())
+
+    def test_pool_matches_in_thread(self, client, pool_client, sample_pdf_b64):
+        """Worker processes should produce the same result as in-thread execution."""
+        body = {"operation": "extract", "data": sample_pdf_b64, "options": {"output_format": "json"}}
+
+        expected = _json(client.post("/process", json=body))
+        actual = _json(pool_client.post("/process", json=body))
+
+        assert actual["success"] is True
+        assert actual["result"] == expected["result"]
+        assert actual["metadata"] == expected["metadata"]
+
+    def test_pool_long_document_fans_out(self, client, pool_client, monkeypatch, multipage_pdf_bytes):
+        """Documents long enough to split should fan their pages out rather than run whole in one worker."""
+        calls = []
+
+        def recording_map(fn, data, page_numbers, workers, *args):
+            calls.append((list(page_numbers), workers))
+            return map_page_segments(fn, data, page_numbers, workers, *args)
+
+        monkeypatch.setattr(text_extraction, "map_page_segments", recording_map)
+        body = {
+            "operation": "extract",
+            "data": base64.b64encode(multipage_pdf_bytes).decode("utf-8"),
+            "options": {"output_format": "json"},
+        }
+
+        actual = _json(pool_client.post("/process", json=body))
+        assert calls == [([1, 2, 3], 2)]
+
+        expected = _json(client.post("/process", json=body))
+        assert actual["success"] is True
+        assert actual["result"] == expected["result"]
+
+    def test_pool_invalid_pdf(self, pool_client):
+        """Backend validation errors should cross the process boundary as 400s."""
+        response = pool_client.post(
+            "/api/detect-text-layer",
+            files={"file": ("test.pdf", b"not a pdf", "application/pdf")},
+        )
+        assert response.status_code == 400
+
+
 class TestRequestValidation:
     """Tests for request validation."""
 
@@ -222,6 +379,15 @@ class TestRequestValidation:
         response = client.post("/api/detect-text-layer")
         assert response.status_code == 422
 
+    def test_malformed_json_process(self, client):
+        """Malformed JSON in /process should return validation error."""
+        response = client.post(
+            "/process",
+            content=b'{"operation": "extract", "data": ',
+            headers={"Content-Type": "application/json"},
+        )
+        assert response.status_code == 422
+
     def test_missing_operation_process(self, client):
         """Missing operation in /process should return validation error."""
         response = client.post("/process", json={
@@ -229,6 +395,33 @@ class TestRequestValidation:
             "options": {},
         })
         assert response.status_code == 422
+        assert _json(response)["detail"][0]["loc"] == ["body", "operation"]
+
+    def test_file_size_limit_extract(self, config_env, sample_pdf_bytes):
+        """Oversized uploads should be rejected by the multipart endpoints."""
+        config_env(MAX_FILE_SIZE_MB=0)
+        limited_client = TestClient(create_app())
+
+        for endpoint in ("/api/extract", "/api/detect-text-layer"):
+            response = limited_client.post(
+                endpoint,
+                files={"file": ("test.pdf", sample_pdf_bytes, "application/pdf")},
+            )
+            assert response.status_code == 400
+            assert "limit" in _json(response)["detail"]["error"]
+
+    def test_file_size_limit_process(self, config_env, sample_pdf_b64):
+        """Oversized payloads should be rejected with the limit set at app creation."""
+        config_env(MAX_FILE_SIZE_MB=0)
+        limited_client = TestClient(create_app())
+
+        response = limited_client.post("/process", json={
+            "operation": "extract",
+            "data": sample_pdf_b64,
+            "options": {},
+        })
+        assert response.status_code == 400
+        assert _json(response)["detail"]["error"]["code"] == "FILE_TOO_LARGE"
 
 
 if __name__ == "__main__":
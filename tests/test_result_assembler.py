@@ -1,7 +1,7 @@
 """Tests for result assembler."""
 
 import pytest
-from src.converters.result_assembler import ResultAssembler
+from src.converters.result_assembler import ResultAssembler, VECTORIZE_MIN_PARAGRAPHS
 
 
 class TestResultAssembler:
@@ -55,6 +55,30 @@ class TestResultAssembler:
         block_ids = [b["content_id"] for b in result["content_blocks"]]
         assert block_ids == ["para-1", "para-2", "para-0"]
 
+    def test_content_block_ordering_mixed_types(self):
+        """Tables and images should interleave with paragraphs; ties keep insertion order."""
+        paragraphs = [
+            {
+                "id": "para-0", "content": "Caption", "role": None,
+                "page_number": 1, "bounding_box": {"x_min": 0, "y_min": 200, "x_max": 100, "y_max": 220},
+                "font": {"name": "Arial", "size": 12.0, "bold": False},
+            },
+        ]
+        tables = [
+            {"id": "table-0", "page_number": 1,
+             "bounding_box": {"x_min": 0, "y_min": 50, "x_max": 100, "y_max": 150}},
+        ]
+        images = [
+            {"id": "img-0", "page_number": 1,
+             "bounding_box": {"x_min": 0, "y_min": 200, "x_max": 100, "y_max": 300}},
+        ]
+        result = self.assembler.assemble(
+            paragraphs=paragraphs, tables=tables, images=images, total_pages=1
+        )
+
+        block_ids = [b["content_id"] for b in result["content_blocks"]]
+        assert block_ids == ["table-0", "para-0", "img-0"]
+
     def test_table_overlap_filtering(self):
         """Paragraphs overlapping tables should be filtered out."""
         paragraphs = [
@@ -81,7 +105,7 @@ class TestResultAssembler:
         result = self.assembler.assemble(paragraphs=paragraphs, tables=tables, total_pages=1)
 
         # para-1 overlaps with table-0, should be filtered
-        para_ids = [p["id"] for p in result["paragraphs"]]
+        para_ids = {p["id"] for p in result["paragraphs"]}
         assert "para-0" in para_ids
         assert "para-1" not in para_ids
 
@@ -106,6 +130,63 @@ class TestResultAssembler:
 
         assert len(result["paragraphs"]) == 1
 
+    def test_overlap_filtering_per_page(self):
+        """Only tables on a paragraph's own page should filter it."""
+        bbox = {"x_min": 50, "y_min": 100, "x_max": 200, "y_max": 120}
+        paragraphs = [
+            {
+                "id": f"para-{n}", "content": f"Page {n + 1} text", "role": None,
+                "page_number": n + 1, "bounding_box": bbox,
+                "font": {"name": "Arial", "size": 12.0, "bold": False},
+            }
+            for n in range(3)
+        ]
+        tables = [
+            {
+                "id": "table-0", "page_number": 2,
+                "bounding_box": {"x_min": 40, "y_min": 90, "x_max": 300, "y_max": 200},
+                "rows": 2, "columns": 2, "cells": [],
+            },
+        ]
+        result = self.assembler.assemble(paragraphs=paragraphs, tables=tables, total_pages=3)
+
+        para_ids = [p["id"] for p in result["paragraphs"]]
+        assert para_ids == ["para-0", "para-2"]
+
+    def test_vectorized_overlap_matches_scalar(self):
+        """Large documents take the NumPy path and should filter identically."""
+        paragraphs = [
+            {
+                "id": f"para-{n}", "content": f"Line {n}", "role": None,
+                "page_number": 1 + n % 2,
+                "bounding_box": {"x_min": 50, "y_min": 20 * n, "x_max": 200, "y_max": 20 * n + 15},
+                "font": {"name": "Arial", "size": 12.0, "bold": False},
+            }
+            for n in range(VECTORIZE_MIN_PARAGRAPHS * 2)
+        ]
+        tables = [
+            {
+                "id": "table-0", "page_number": 1,
+                "bounding_box": {"x_min": 40, "y_min": 300, "x_max": 300, "y_max": 500},
+                "rows": 2, "columns": 2, "cells": [],
+            },
+            {
+                "id": "table-1", "page_number": 2,
+                "bounding_box": {"x_min": 250, "y_min": 0, "x_max": 400, "y_max": 900},
+                "rows": 2, "columns": 2, "cells": [],
+            },
+        ]
+        result = self.assembler.assemble(paragraphs=paragraphs, tables=tables, total_pages=2)
+
+        expected = [
+            p["id"] for p in paragraphs
+            if not self.assembler._overlaps_any_table(
+                p, [t for t in tables if t["page_number"] == p["page_number"]]
+            )
+        ]
+        assert [p["id"] for p in result["paragraphs"]] == expected
+        assert len(expected) < len(paragraphs)
+
     def test_empty_input(self):
         """Should handle empty inputs gracefully."""
         result = self.assembler.assemble(paragraphs=[], tables=[], total_pages=0)
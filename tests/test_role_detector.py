@@ -1,9 +1,28 @@
 """Tests for semantic role detection from font heuristics."""
 
+from functools import lru_cache
+from itertools import count
+
 import pytest
 from src.converters.role_detector import RoleDetector
 
 
+# Unique paragraph ids; id(content) could repeat once strings are garbage collected
+_next_id = count()
+
+
+@lru_cache(maxsize=None)
+def _para_template(content, size, bold, font):
+    """Shared paragraph template; the detector only ever writes "role"."""
+    return {
+        "content": content,
+        "role": None,
+        "page_number": 1,
+        "bounding_box": {"x_min": 0, "y_min": 0, "x_max": 100, "y_max": 20},
+        "font": {"name": font, "size": size, "bold": bold},
+    }
+
+
 class TestRoleDetector:
     """Tests for RoleDetector."""
 
@@ -11,53 +30,45 @@ class TestRoleDetector:
         self.detector = RoleDetector()
 
     def _make_para(self, content, size=12.0, bold=False, font="Arial"):
+        # Top-level copy so setting "role" never touches the cached template
         return {
-            "id": f"para-{id(content)}",
-            "content": content,
+            "id": f"para-{next(_next_id)}",
+            **_para_template(content, size, bold, font),
             "role": None,
-            "page_number": 1,
-            "bounding_box": {"x_min": 0, "y_min": 0, "x_max": 100, "y_max": 20},
-            "font": {"name": font, "size": size, "bold": bold},
         }
 
-    def test_title_detection_by_size(self):
-        """Large font should be classified as title."""
+    @pytest.mark.parametrize("content,size,bold,body_font_size,expected", [
+        # Above the absolute title threshold
+        ("Document Title", 24.0, True, 12.0, "title"),
+        # Above the absolute heading threshold
+        ("Section Heading", 16.0, False, 12.0, "sectionHeading"),
+        # Bold and slightly larger than body text
+        ("Bold Heading", 13.5, True, 12.0, "sectionHeading"),
+        # Body-sized text
+        ("Body text", 12.0, False, 12.0, None),
+        # >= 1.5x body size and bold, though below the 18pt title threshold
+        ("Big Bold Text", 17.0, True, 11.0, "title"),
+    ])
+    def test_role_by_size_and_weight(self, content, size, bold, body_font_size, expected):
+        """A paragraph's role should follow from its font relative to the body text."""
         paragraphs = [
-            self._make_para("Document Title", size=24.0, bold=True),
-            self._make_para("Body text that is long enough to be the dominant size. " * 5, size=12.0),
+            self._make_para(content, size=size, bold=bold),
+            self._make_para("Body text that is long enough to be the dominant size. " * 10, size=body_font_size),
         ]
         self.detector.classify(paragraphs)
-        assert paragraphs[0]["role"] == "title"
+        assert paragraphs[0]["role"] == expected
         assert paragraphs[1]["role"] is None
 
-    def test_heading_detection_by_size(self):
-        """Medium font should be classified as sectionHeading."""
+    def test_repeated_fonts_share_role(self):
+        """Paragraphs with the same size and weight should all get the same role."""
         paragraphs = [
-            self._make_para("Section Heading", size=16.0),
-            self._make_para("Body text that is long enough to be dominant. " * 5, size=12.0),
+            self._make_para("Heading A", size=16.0, bold=True),
+            self._make_para("Body text that is long enough to be the dominant size. " * 10, size=12.0),
+            self._make_para("Heading B", size=16.0, bold=True),
+            self._make_para("More body text that is long enough to be dominant. " * 10, size=12.0),
         ]
         self.detector.classify(paragraphs)
-        assert paragraphs[0]["role"] == "sectionHeading"
-        assert paragraphs[1]["role"] is None
-
-    def test_heading_detection_bold_larger(self):
-        """Bold text slightly larger than body should be heading."""
-        paragraphs = [
-            self._make_para("Bold Heading", size=13.5, bold=True),
-            self._make_para("Normal body text repeated many times. " * 10, size=12.0),
-        ]
-        self.detector.classify(paragraphs)
-        assert paragraphs[0]["role"] == "sectionHeading"
-
-    def test_body_text_stays_none(self):
-        """Body-sized text should remain None."""
-        paragraphs = [
-            self._make_para("First paragraph of body text. " * 5, size=12.0),
-            self._make_para("Second paragraph of body text. " * 5, size=12.0),
-        ]
-        self.detector.classify(paragraphs)
-        assert paragraphs[0]["role"] is None
-        assert paragraphs[1]["role"] is None
+        assert [p["role"] for p in paragraphs] == ["sectionHeading", None, "sectionHeading", None]
 
     def test_empty_paragraphs(self):
         """Should handle empty list gracefully."""
@@ -85,12 +96,11 @@ class TestRoleDetector:
         body_size = self.detector._detect_body_font_size(paragraphs)
         assert body_size == 11.0
 
-    def test_title_by_relative_size_and_bold(self):
-        """Text >= 1.5x body size and bold should be title even below absolute threshold."""
+    def test_precomputed_body_size(self):
+        """A supplied body size should be used instead of detecting one."""
         paragraphs = [
-            self._make_para("Big Bold Text", size=17.0, bold=True),
-            self._make_para("Normal text repeated a lot of times. " * 10, size=11.0),
+            self._make_para("Short chunk text", size=13.5, bold=True),
         ]
-        # 17pt / 11pt = 1.54x and bold → title even though 17 < 18 threshold
-        self.detector.classify(paragraphs)
-        assert paragraphs[0]["role"] == "title"
+        # Alone, 13.5pt would be the body size; against an 11pt document it is a heading
+        self.detector.classify(paragraphs, body_size=11.0)
+        assert paragraphs[0]["role"] == "sectionHeading"